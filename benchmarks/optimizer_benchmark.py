@@ -0,0 +1,200 @@
+"""
+Optimizer scaling benchmark.
+
+Generates synthetic warehouse/order networks in the schema of
+data/sample_warehouses.csv and data/sample_sales.csv, runs every requested
+InventoryOptimizer mode on each size and writes a JSON report with wall time,
+peak traced memory, total cost and fulfillment, plus cost relative to the
+greedy baseline of the same network. Wall time comes from an untraced run and
+peak memory from a second, traced one, since tracing slows Python-heavy modes
+down severalfold. The baseline is plain greedy without local search.
+
+Run from the repository root:
+
+    python -m benchmarks.optimizer_benchmark --warehouses 10 100 --orders 1000 10000
+"""
+import argparse
+import json
+import logging
+import platform
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import Dict, Any, List
+import numpy as np
+import pandas as pd
+from src.backend.optimizer import InventoryOptimizer, OPTIMIZATION_MODES
+
+REGIONS = ['Americas', 'Europe', 'Africa', 'Asia', 'Oceania']
+BASE_DATETIME = datetime(2025, 3, 24, 15, 30)
+
+
+def generate_warehouses(count: int, total_stock: float, seed: int = 0) -> pd.DataFrame:
+    """Synthetic warehouses in the sample_warehouses.csv schema holding total_stock units"""
+    rng = np.random.default_rng(seed)
+    weights = rng.uniform(0.5, 1.5, count)
+    current_stock = np.ceil(weights / weights.sum() * total_stock).astype(int)
+    return pd.DataFrame({
+        'warehouse_id': [f"W{i + 1:04d}" for i in range(count)],
+        'name': [f"Warehouse {i + 1}" for i in range(count)],
+        'capacity': np.ceil(current_stock / rng.uniform(0.5, 0.9, count)).astype(int),
+        'current_stock': current_stock,
+        'location': [f"City {i + 1}" for i in range(count)],
+        'storage_cost': rng.integers(800, 1600, count),
+        'last_updated': BASE_DATETIME.strftime('%Y-%m-%d %H:%M:%S'),
+        'latitude': rng.uniform(-50, 60, count).round(4),
+        'longitude': rng.uniform(-170, 170, count).round(4)
+    })
+
+
+def generate_orders(count: int, seed: int = 0) -> pd.DataFrame:
+    """Synthetic orders in the sample_sales.csv schema"""
+    rng = np.random.default_rng(seed + 1)
+    longitude = rng.uniform(-170, 170, count).round(4)
+    latitude = rng.uniform(-50, 60, count).round(4)
+    region = np.select(
+        [longitude < -30, (longitude < 60) & (latitude >= 15), longitude < 60, latitude >= -10],
+        REGIONS[:4], default=REGIONS[4]
+    )
+    order_time = BASE_DATETIME - pd.to_timedelta(rng.integers(0, 72 * 60, count), unit='m')
+    return pd.DataFrame({
+        'order_id': [f"ORD{i + 1:07d}" for i in range(count)],
+        'date': order_time.strftime('%Y-%m-%d %H:%M:%S'),
+        'product_id': [f"P{p:03d}" for p in rng.integers(1, 6, count)],
+        'quantity': rng.integers(50, 1000, count),
+        'customer_name': [f"Customer {c}" for c in rng.integers(1, 5000, count)],
+        'delivery_deadline': (order_time + timedelta(days=2)).strftime('%Y-%m-%d %H:%M:%S'),
+        'region': region,
+        'status': rng.choice(['Pending', 'Urgent'], count, p=[0.7, 0.3]),
+        'delivery_latitude': latitude,
+        'delivery_longitude': longitude
+    })
+
+
+def run_case(optimizer: InventoryOptimizer,
+             warehouses: pd.DataFrame,
+             orders: pd.DataFrame,
+             mode: str,
+             local_search: bool = True) -> Dict[str, Any]:
+    """Time one untraced optimizer run, then record peak traced memory in a second run"""
+    def cold_run() -> Dict[str, Any]:
+        # Every run starts cold: no cached distances, results or warm-start plans
+        optimizer._distance_cache.clear()
+        optimizer._result_cache.clear()
+        optimizer._warm_plans.clear()
+        return optimizer.optimize(warehouses, orders, mode=mode)
+
+    optimizer.local_search = local_search
+    start_time = time.perf_counter()
+    try:
+        results = cold_run()
+    except ValueError as e:
+        return {'status': 'Failed', 'error': str(e)}
+    wall_time = time.perf_counter() - start_time
+
+    tracemalloc.start()
+    try:
+        cold_run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    metrics = results['performance_metrics']
+    return {
+        'status': results['status'],
+        'wall_time': wall_time,
+        'solving_time': results['solving_time'],
+        'peak_memory_mb': peak / 2 ** 20,
+        'total_cost': results['total_cost'],
+        'fulfilled_orders': metrics['fulfilled_orders'],
+        'fulfillment_rate': metrics['fulfillment_rate']
+    }
+
+
+def run_benchmark(warehouse_counts: List[int],
+                  order_counts: List[int],
+                  modes: List[str],
+                  stock_ratio: float,
+                  max_lanes: int,
+                  solver_time: int,
+                  seed: int) -> Dict[str, Any]:
+    """Run every mode on every network size"""
+    optimizer = InventoryOptimizer()
+    optimizer.solver_time = solver_time
+    cases = []
+    # Plain greedy is the baseline; the requested modes run with local search
+    variants = [('greedy', False)] + [(mode, True) for mode in modes]
+
+    for order_count in order_counts:
+        orders = generate_orders(order_count, seed)
+        total_stock = orders['quantity'].sum() * stock_ratio
+        for warehouse_count in warehouse_counts:
+            warehouses = generate_warehouses(warehouse_count, total_stock, seed)
+            lanes = warehouse_count * order_count
+            baseline = None
+
+            for mode, local_search in variants:
+                case = {'warehouses': warehouse_count, 'orders': order_count, 'mode': mode,
+                        'local_search': local_search}
+                spatial = mode == 'greedy' and optimizer._use_spatial_index(warehouses, None)
+                if lanes > max_lanes and not spatial:
+                    case.update(status='Skipped', error=f"{lanes} lanes exceed --max-lanes")
+                else:
+                    case.update(run_case(optimizer, warehouses, orders, mode, local_search))
+
+                if (mode, local_search) == variants[0] and 'total_cost' in case:
+                    baseline = case
+                if baseline and 'total_cost' in case:
+                    # Cost is only comparable together with how much demand was served
+                    case['cost_vs_greedy'] = case['total_cost'] / baseline['total_cost']
+                    case['fulfillment_vs_greedy'] = case['fulfillment_rate'] - baseline['fulfillment_rate']
+                cases.append(case)
+                label = mode if local_search else f"{mode}, no local search"
+                logging.info(
+                    f"{warehouse_count} warehouses x {order_count} orders [{label}]: "
+                    f"{case['status']} {case.get('wall_time', 0):.2f}s"
+                )
+
+    return {
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'environment': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'machine': platform.machine()
+        },
+        'settings': {
+            'stock_ratio': stock_ratio,
+            'max_lanes': max_lanes,
+            'solver_time': solver_time,
+            'seed': seed
+        },
+        'cases': cases
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark InventoryOptimizer modes on synthetic networks")
+    parser.add_argument('--warehouses', type=int, nargs='+', default=[10, 100, 1000])
+    parser.add_argument('--orders', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--modes', nargs='+', choices=OPTIMIZATION_MODES, default=list(OPTIMIZATION_MODES))
+    parser.add_argument('--stock-ratio', type=float, default=1.2,
+                        help="Total warehouse stock as a multiple of total order quantity")
+    parser.add_argument('--max-lanes', type=int, default=50_000_000,
+                        help="Skip dense runs with more order x warehouse lanes than this")
+    parser.add_argument('--solver-time', type=int, default=20, help="MILP time limit in seconds")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='benchmark_report.json')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    report = run_benchmark(args.warehouses, args.orders, args.modes, args.stock_ratio,
+                           args.max_lanes, args.solver_time, args.seed)
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2, default=float)
+    logging.info(f"Report written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
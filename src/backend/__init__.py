@@ -1,5 +1,11 @@
-from .optimizer import InventoryOptimizer
-from .data_loader import DataLoader
-from .forecaster import DemandForecaster
-
-__all__ = ['InventoryOptimizer', 'DataLoader', 'DemandForecaster']
\ No newline at end of file
+from .optimizer import InventoryOptimizer
+from .data_loader import DataLoader
+from .forecaster import DemandForecaster
+from .session import OptimizationSession
+from .stock_matrix import StockMatrix
+from .consolidator import ShipmentConsolidator
+from src.utils.validator import DataValidator
+from .snapshot import OptimizerSnapshot
+
+__all__ = ['InventoryOptimizer', 'DataLoader', 'DemandForecaster', 'OptimizationSession', 'StockMatrix',
+           'ShipmentConsolidator', 'DataValidator', 'OptimizerSnapshot']
\ No newline at end of file
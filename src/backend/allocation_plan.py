@@ -0,0 +1,46 @@
+from collections.abc import Mapping
+from typing import Dict, List, Any, Iterator
+import pandas as pd
+
+ALLOCATION_COLUMNS = ['order_id', 'warehouse_id', 'quantity', 'cost', 'distance']
+
+
+class AllocationPlanView(Mapping):
+    """
+    Read-only warehouse_id -> list of shipment dicts view over the columnar
+    allocations table of an optimization result.
+
+    The per-shipment dicts are only built on first access, so callers that
+    work with results['allocations'] directly never pay for them.
+    """
+
+    def __init__(self, allocations: pd.DataFrame):
+        self._allocations = allocations
+        self._plan = None
+
+    def _materialize(self) -> Dict[Any, List[Dict[str, Any]]]:
+        """Group the allocation rows by warehouse, keeping their order"""
+        if self._plan is None:
+            plan = {}
+            columns = (self._allocations[column].tolist() for column in ALLOCATION_COLUMNS)
+            for order_id, warehouse_id, quantity, cost, distance in zip(*columns):
+                plan.setdefault(warehouse_id, []).append({
+                    'order_id': order_id,
+                    'quantity': quantity,
+                    'cost': cost,
+                    'distance': distance
+                })
+            self._plan = plan
+        return self._plan
+
+    def __getitem__(self, warehouse_id) -> List[Dict[str, Any]]:
+        return self._materialize()[warehouse_id]
+
+    def __iter__(self) -> Iterator:
+        return iter(self._materialize())
+
+    def __len__(self) -> int:
+        return self._allocations['warehouse_id'].nunique()
+
+    def __repr__(self) -> str:
+        return f"AllocationPlanView({len(self._allocations)} shipments, {len(self)} warehouses)"
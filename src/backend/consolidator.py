@@ -0,0 +1,202 @@
+import logging
+import time
+from typing import Dict, Any, List, Tuple
+import pandas as pd
+import numpy as np
+from src.backend.optimizer import BASE_COST_PER_KM, _haversine_km
+
+
+class ShipmentConsolidator:
+    """
+    Groups each warehouse's allocated orders into vehicle loads and routes them.
+
+    Drops are swept by bearing around their warehouse and cut into loads by
+    vehicle capacity and stop count; orders due on different days never share
+    a load. Each load is sequenced by nearest neighbour and then improved by
+    2-opt while the time budget lasts. Routes end at the last drop, matching
+    the one-way distance the optimizer charges per order, and are cut wherever
+    driving on is no shorter than sending another vehicle from the depot.
+    """
+
+    def __init__(self,
+                 vehicle_capacity: float = 2000,
+                 max_stops: int = 20,
+                 cost_per_km: float = BASE_COST_PER_KM,
+                 time_budget: float = 5.0):
+        """
+        Args:
+            vehicle_capacity (float): Units one vehicle can carry
+            max_stops (int): Maximum drops per vehicle
+            cost_per_km (float): Vehicle cost per km driven
+            time_budget (float): Seconds available for route improvement
+        """
+        self.logger = logging.getLogger(__name__)
+        self.vehicle_capacity = vehicle_capacity
+        self.max_stops = max_stops
+        self.cost_per_km = cost_per_km
+        self.time_budget = time_budget
+
+    def consolidate(self,
+                    results: Dict[str, Any],
+                    warehouses: pd.DataFrame,
+                    orders: pd.DataFrame) -> Dict[str, Any]:
+        """
+        Build vehicle loads for an optimization result.
+
+        Args:
+            results (Dict[str, Any]): Output of InventoryOptimizer.optimize
+            warehouses (pd.DataFrame): Warehouses with coordinates
+            orders (pd.DataFrame): Orders with delivery coordinates and, optionally,
+                delivery_deadline
+
+        Returns:
+            Dict[str, Any]: 'loads' (one row per vehicle load), 'stops' (one row per
+                drop in route order), consolidated and per-order transport cost
+        """
+        try:
+            start_time = time.time()
+            deadline = start_time + self.time_budget
+
+            shipments = results['allocations'].merge(
+                orders.drop_duplicates('order_id')[self._order_columns(orders)],
+                on='order_id', how='left'
+            )
+            depots = warehouses.drop_duplicates('warehouse_id').set_index('warehouse_id')
+            if 'delivery_deadline' in shipments.columns:
+                shipments['deadline_day'] = pd.to_datetime(shipments['delivery_deadline']).dt.floor('D')
+            else:
+                shipments['deadline_day'] = pd.NaT
+
+            loads, stops = [], []
+            for warehouse_id, drops in shipments.groupby('warehouse_id', sort=False):
+                depot = depots.loc[warehouse_id, ['latitude', 'longitude']].to_numpy(dtype=float)
+                for _, day_drops in drops.groupby('deadline_day', sort=True, dropna=False):
+                    for load in self._sweep(depot, day_drops):
+                        route, legs = self._route(depot, load, deadline)
+                        direct = load['distance'].to_numpy(dtype=float)[route]
+                        # Savings check: a drop no farther from the depot than from
+                        # the previous stop starts a new vehicle
+                        cuts = np.flatnonzero(legs[1:] >= direct[1:]) + 1
+                        for positions in np.split(np.arange(route.size), cuts):
+                            drops_in_order = load.iloc[route[positions]]
+                            distance = direct[positions[0]] + legs[positions[1:]].sum()
+                            quantity = drops_in_order['quantity'].sum()
+                            load_id = len(loads) + 1
+                            loads.append({
+                                'load_id': load_id,
+                                'warehouse_id': warehouse_id,
+                                'deadline_day': drops_in_order['deadline_day'].iloc[0],
+                                'stops': len(positions),
+                                'quantity': quantity,
+                                'vehicles': max(int(np.ceil(quantity / self.vehicle_capacity)), 1),
+                                'route_distance': distance,
+                                'route_cost': distance * self.cost_per_km
+                            })
+                            stops.extend(
+                                {'load_id': load_id, 'stop': stop + 1, 'order_id': order_id,
+                                 'quantity': drop_quantity}
+                                for stop, (order_id, drop_quantity) in enumerate(
+                                    drops_in_order[['order_id', 'quantity']].to_numpy()
+                                )
+                            )
+
+            loads = pd.DataFrame(loads, columns=[
+                'load_id', 'warehouse_id', 'deadline_day', 'stops', 'quantity',
+                'vehicles', 'route_distance', 'route_cost'
+            ])
+            stops = pd.DataFrame(stops, columns=['load_id', 'stop', 'order_id', 'quantity'])
+            consolidated_cost = float((loads['route_cost'] * loads['vehicles']).sum())
+            unconsolidated_cost = float((shipments['distance'] * self.cost_per_km).sum())
+            return {
+                'loads': loads,
+                'stops': stops,
+                'consolidated_cost': consolidated_cost,
+                'unconsolidated_cost': unconsolidated_cost,
+                'savings': unconsolidated_cost - consolidated_cost,
+                'solving_time': time.time() - start_time,
+                'route_improvement_completed': time.time() < deadline
+            }
+
+        except Exception as e:
+            self.logger.error(f"Consolidation error: {str(e)}")
+            raise ValueError(f"Consolidation error: {str(e)}")
+
+    @staticmethod
+    def _order_columns(orders: pd.DataFrame) -> List[str]:
+        """Order columns needed to place and schedule drops"""
+        columns = ['order_id', 'delivery_latitude', 'delivery_longitude']
+        return columns + (['delivery_deadline'] if 'delivery_deadline' in orders.columns else [])
+
+    def _sweep(self, depot: np.ndarray, drops: pd.DataFrame) -> List[pd.DataFrame]:
+        """Cut drops sorted by bearing from the depot into capacity/stop-bounded loads"""
+        lat1, lon1 = np.radians(depot)
+        lat2 = np.radians(drops['delivery_latitude'].to_numpy(dtype=float))
+        dlon = np.radians(drops['delivery_longitude'].to_numpy(dtype=float)) - lon1
+        bearings = np.arctan2(
+            np.sin(dlon) * np.cos(lat2),
+            np.cos(lat1) * np.sin(lat2) - np.sin(lat1) * np.cos(lat2) * np.cos(dlon)
+        )
+        bearings = np.nan_to_num(bearings)
+        order = np.argsort(bearings, kind='stable')
+
+        # Start the sweep after the widest angular gap so no cluster is cut in two
+        if order.size > 1:
+            sorted_bearings = bearings[order]
+            gaps = np.diff(np.append(sorted_bearings, sorted_bearings[0] + 2 * np.pi))
+            order = np.roll(order, -(int(gaps.argmax()) + 1))
+
+        quantities = drops['quantity'].to_numpy(dtype=float)[order]
+        loads, current, load_quantity = [], [], 0.0
+        for position, quantity in zip(order, quantities):
+            if current and (load_quantity + quantity > self.vehicle_capacity
+                            or len(current) >= self.max_stops):
+                loads.append(drops.iloc[current])
+                current, load_quantity = [], 0.0
+            current.append(position)
+            load_quantity += quantity
+        if current:
+            loads.append(drops.iloc[current])
+        return loads
+
+    @staticmethod
+    def _route(depot: np.ndarray, load: pd.DataFrame, deadline: float) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Sequence one load as a route from the depot to its last drop.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Drop positions in visiting order and the
+                length in km of the leg that reaches each of them
+        """
+        lat = np.concatenate([[depot[0]], load['delivery_latitude'].to_numpy(dtype=float)])
+        lon = np.concatenate([[depot[1]], load['delivery_longitude'].to_numpy(dtype=float)])
+        # Node 0 is the depot; a final free node closes the route at zero cost,
+        # so 2-opt on the closed tour optimizes the open route
+        distances = np.zeros((len(lat) + 1, len(lat) + 1))
+        distances[:-1, :-1] = _haversine_km(lat[:, np.newaxis], lon[:, np.newaxis], lat, lon)
+        distances[~np.isfinite(distances)] = 0.0
+
+        # Nearest neighbour from the depot
+        tour = [0]
+        unvisited = np.ones(len(lat), dtype=bool)
+        unvisited[0] = False
+        while unvisited.any():
+            candidates = np.flatnonzero(unvisited)
+            nearest = candidates[distances[tour[-1], candidates].argmin()]
+            tour.append(nearest)
+            unvisited[nearest] = False
+        tour = np.array(tour + [len(lat)])
+
+        # 2-opt: reverse a segment whenever that shortens the route
+        improved = True
+        while improved and time.time() < deadline:
+            improved = False
+            for i in range(1, len(tour) - 2):
+                a, b = tour[i - 1], tour[i]
+                c, d = tour[i + 1:-1], tour[i + 2:]
+                gains = distances[a, b] + distances[c, d] - distances[a, c] - distances[b, d]
+                if gains.size and gains.max() > 1e-9:
+                    j = i + 1 + int(gains.argmax())
+                    tour[i:j + 1] = tour[i:j + 1][::-1]
+                    improved = True
+
+        return tour[1:-1] - 1, distances[tour[:-2], tour[1:-1]]
@@ -1,175 +1,1935 @@
-import logging
-import time
-from math import radians, sin, cos, sqrt, atan2
-import pandas as pd
-import numpy as np
-from typing import Dict, List, Any
-
-class InventoryOptimizer:
-    def __init__(self):
-        """Initialize the optimizer with default parameters"""
-        self.logger = logging.getLogger(__name__)
-        self.solver_time = 20  # Default solver time limit in seconds
-        self.current_datetime = "2025-03-24 21:07:26"  # Updated timestamp
-        self.current_user = "tanishpoddar"
-
-    def calculate_distance(self, warehouse_row: pd.Series, order_row: pd.Series) -> float:
-        """Calculate distance between warehouse and delivery location using Haversine formula"""
-        try:
-            # Extract coordinates
-            lat1, lon1 = warehouse_row['latitude'], warehouse_row['longitude']
-            lat2, lon2 = order_row['delivery_latitude'], order_row['delivery_longitude']
-            
-            # Convert to radians
-            lat1, lon1 = map(radians, [float(lat1), float(lon1)])
-            lat2, lon2 = map(radians, [float(lat2), float(lon2)])
-            
-            # Haversine formula
-            dlat = lat2 - lat1
-            dlon = lon2 - lon1
-            a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
-            c = 2 * atan2(sqrt(a), sqrt(1-a))
-            r = 6371  # Earth's radius in kilometers
-            
-            return c * r
-        except Exception as e:
-            self.logger.error(f"Error calculating distance: {str(e)}")
-            return float('inf')
-
-    def optimize(self, warehouses: pd.DataFrame, orders: pd.DataFrame) -> Dict[str, Any]:
-        """Optimize inventory distribution"""
-        try:
-            optimization_start_time = time.time()
-            
-            # Initialize results dictionary
-            results = {
-                'allocation_plan': {},
-                'warehouse_utilization': {},
-                'unfulfilled_orders': [],
-                'total_cost': 0,
-                'solving_time': 0,
-                'status': 'In Progress',
-                'optimization_timestamp': self.current_datetime,
-                'optimization_user': self.current_user
-            }
-
-            # Create a copy of warehouses to track inventory changes
-            warehouse_inventory = warehouses.copy()
-            
-            # Sort orders by priority (urgent first) and size
-            orders = orders.sort_values(
-                by=['status', 'quantity'], 
-                ascending=[True, False]
-            )
-
-            # Process each order
-            for _, order in orders.iterrows():
-                best_allocation = {
-                    'warehouse_id': None,
-                    'cost': float('inf'),
-                    'distance': float('inf')
-                }
-
-                # Find best warehouse for this order
-                for _, warehouse in warehouse_inventory.iterrows():
-                    if warehouse['current_stock'] >= order['quantity']:
-                        # Calculate transportation cost based on distance
-                        distance = self.calculate_distance(warehouse, order)
-                        cost = distance * 10  # Base cost per km
-                        
-                        # Add storage cost factor
-                        cost += warehouse['storage_cost'] * order['quantity'] * 0.01
-                        
-                        if cost < best_allocation['cost']:
-                            best_allocation.update({
-                                'warehouse_id': warehouse['warehouse_id'],
-                                'cost': cost,
-                                'distance': distance
-                            })
-
-                # Allocate order if possible
-                if best_allocation['warehouse_id'] is not None:
-                    warehouse_id = best_allocation['warehouse_id']
-                    
-                    # Initialize warehouse in allocation plan if not exists
-                    if warehouse_id not in results['allocation_plan']:
-                        results['allocation_plan'][warehouse_id] = []
-                    
-                    # Add allocation
-                    results['allocation_plan'][warehouse_id].append({
-                        'order_id': order['order_id'],
-                        'quantity': order['quantity'],
-                        'cost': best_allocation['cost'],
-                        'distance': best_allocation['distance']
-                    })
-                    
-                    # Update warehouse inventory
-                    mask = warehouse_inventory['warehouse_id'] == warehouse_id
-                    warehouse_inventory.loc[mask, 'current_stock'] -= order['quantity']
-                    
-                    # Update warehouse utilization
-                    warehouse_row = warehouses[warehouses['warehouse_id'] == warehouse_id].iloc[0]
-                    results['warehouse_utilization'][warehouse_id] = {
-                        'warehouse_name': warehouse_row['name'],
-                        'initial_stock': warehouse_row['current_stock'],
-                        'used_capacity': order['quantity'],
-                        'remaining_stock': warehouse_inventory.loc[mask, 'current_stock'].iloc[0],
-                        'total_capacity': warehouse_row['capacity'],
-                        'utilization_percentage': (
-                            (warehouse_row['current_stock'] - order['quantity']) / 
-                            warehouse_row['capacity'] * 100
-                        )
-                    }
-                    
-                    # Update total cost
-                    results['total_cost'] += best_allocation['cost']
-                else:
-                    # Add to unfulfilled orders
-                    results['unfulfilled_orders'].append({
-                        'order_id': order['order_id'],
-                        'quantity': order['quantity'],
-                        'reason': 'Insufficient stock across all warehouses'
-                    })
-
-            # Calculate solving time and update status
-            results['solving_time'] = time.time() - optimization_start_time
-            results['status'] = 'Completed'
-            
-            # Add performance metrics
-            results['performance_metrics'] = {
-                'total_orders': len(orders),
-                'fulfilled_orders': len(orders) - len(results['unfulfilled_orders']),
-                'fulfillment_rate': (
-                    (len(orders) - len(results['unfulfilled_orders'])) / 
-                    len(orders) * 100
-                ),
-                'average_cost_per_order': (
-                    results['total_cost'] / 
-                    (len(orders) - len(results['unfulfilled_orders']))
-                    if (len(orders) - len(results['unfulfilled_orders'])) > 0 
-                    else 0
-                )
-            }
-
-            return results
-
-        except Exception as e:
-            self.logger.error(f"Optimization error: {str(e)}")
-            raise ValueError(f"Optimization error: {str(e)}")
-
-    def get_optimization_summary(self, results: Dict[str, Any]) -> Dict[str, Any]:
-        """Generate a summary of optimization results"""
-        try:
-            return {
-                'total_cost': round(results['total_cost'], 2),
-                'total_orders': results['performance_metrics']['total_orders'],
-                'fulfilled_orders': results['performance_metrics']['fulfilled_orders'],
-                'fulfillment_rate': round(results['performance_metrics']['fulfillment_rate'], 1),
-                'average_cost_per_order': round(results['performance_metrics']['average_cost_per_order'], 2),
-                'solving_time': round(results['solving_time'], 2),
-                'status': results['status'],
-                'timestamp': results['optimization_timestamp']
-            }
-        except Exception as e:
-            self.logger.error(f"Error generating optimization summary: {str(e)}")
-            return {}
\ No newline at end of file
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from math import radians, sin, cos, sqrt, atan2
+import pandas as pd
+import numpy as np
+import pulp
+from scipy import sparse
+from scipy.optimize import linprog
+from scipy.spatial import cKDTree
+from typing import Dict, List, Any, Iterable, Iterator, Optional, Tuple
+from src.config import OPTIMIZATION_PARAMS
+from src.backend.allocation_plan import AllocationPlanView, ALLOCATION_COLUMNS
+from src.backend.stock_matrix import StockMatrix
+from src.backend.snapshot import OptimizerSnapshot
+
+EARTH_RADIUS_KM = 6371
+BASE_COST_PER_KM = 10  # Transportation cost per km when no lane rate is given
+STORAGE_COST_FACTOR = 0.01  # Share of storage cost charged per unit shipped
+
+OPTIMIZATION_MODES = ('greedy', 'milp', 'split')
+PARTITIONED_MODES = ('greedy', 'split')  # MILP utilization bounds couple all regions/chunks
+SPLIT_SIMPLEX_MAX_LANES = 50000  # Larger split LPs are solved by interior point
+# Seconds per model order held back from each split LP solve for building the
+# model, HiGHS noticing its time limit late and placing orders greedily after it
+SPLIT_SECONDS_PER_ORDER = 1e-5
+WARM_START_MODES = ('greedy', 'milp')
+# Result and solver statuses from best to worst, for combining sub-runs
+RUN_STATUSES = ('Completed', 'Time Limit Reached')
+SOLVER_STATUSES = ('Optimal', 'No feasible lanes', 'Feasible', 'Not Solved')
+# PuLP model build, CBC file I/O and presolve run outside CBC's time limit;
+# their cost per model lane is estimated from this until a solve is measured
+MILP_SECONDS_PER_LANE = 5e-5
+MILP_MIN_SEARCH_TIME = 0.5  # Seconds of MILP search worth starting CBC for
+MILP_TIME_MARGIN = 0.1  # Share of solver_time kept back for CBC checking its limit late
+# Result entries keyed by order or warehouse ID; JSON stores them as (ID, value) pairs
+# so non-string IDs survive the disk cache
+RESULT_MAPPINGS = ('warehouse_utilization', 'split_orders')
+
+# Input columns that determine an optimization result
+WAREHOUSE_KEY_COLUMNS = ['warehouse_id', 'name', 'capacity', 'current_stock', 'storage_cost',
+                         'latitude', 'longitude']
+ORDER_KEY_COLUMNS = ['order_id', 'quantity', 'status', 'delivery_latitude', 'delivery_longitude']
+
+
+def _unit_vectors(lat: np.ndarray, lon: np.ndarray) -> np.ndarray:
+    """Positions on the unit sphere for latitude/longitude arrays in degrees"""
+    lat, lon = np.radians(lat), np.radians(lon)
+    return np.column_stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)])
+
+
+def _chord_to_km(chord: float) -> float:
+    """Great-circle distance for a straight-line distance between unit vectors"""
+    return 2 * np.arcsin(min(chord / 2, 1.0)) * EARTH_RADIUS_KM
+
+
+def _haversine_km(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """Broadcasting haversine distance in km"""
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * np.arcsin(np.sqrt(np.clip(a, 0, 1))) * EARTH_RADIUS_KM
+
+
+class InventoryOptimizer:
+    def __init__(self):
+        """Initialize the optimizer with default parameters"""
+        self.logger = logging.getLogger(__name__)
+        self.solver_time = 20  # Default solver time limit in seconds
+        self.current_datetime = "2025-03-24 21:07:26"  # Updated timestamp
+        self.current_user = "tanishpoddar"
+
+        # Warehouse stock bounds (fraction of capacity) enforced by the MILP mode
+        self.min_utilization = OPTIMIZATION_PARAMS["MIN_UTILIZATION"]
+        self.max_utilization = OPTIMIZATION_PARAMS["MAX_UTILIZATION"]
+        self.milp_candidates = 5  # Lanes per order seeded into the MILP
+        self._milp_lane_seconds = MILP_SECONDS_PER_LANE
+        self.split_candidates = 4  # Lanes per order seeded into the split-shipment flow
+
+        # Greedy runs on networks at least this large search a spatial index
+        # for the nearest warehouses instead of pricing every lane
+        self.spatial_index_threshold = 1000
+        self.spatial_candidates = 16
+        self._spatial_index = None
+
+        # Greedy plans are improved by relocate/swap moves over each order's
+        # cheapest lanes until no move helps or solver_time runs out
+        self.local_search = True
+        self.local_search_candidates = 8
+
+        # Distance matrices keyed by a digest of the coordinate arrays
+        self.distance_cache_size = 2
+        self._distance_cache = OrderedDict()
+
+        # Region-partitioned runs: each region sees the nearest warehouses of its orders
+        self.regional_candidates = 8
+        self.partition_workers = os.cpu_count() or 1
+
+        # Results keyed by a content hash of the inputs and settings, kept in
+        # memory and optionally on disk in result_cache_dir, as Parquet
+        # allocations plus JSON, so reading the cache never runs code from it
+        self.result_cache_size = 8
+        self.result_cache_dir = None
+        self.result_cache_disk_entries = 64
+        self._result_cache = OrderedDict()
+        # Latest plan per mode, used to warm-start runs on changed inputs when
+        # enabled; a warm-started plan depends on the runs before it
+        self.warm_start = False
+        self._warm_plans = {}
+
+    def calculate_distance(self, warehouse_row: pd.Series, order_row: pd.Series) -> float:
+        """Calculate distance between warehouse and delivery location using Haversine formula"""
+        try:
+            # Extract coordinates
+            lat1, lon1 = warehouse_row['latitude'], warehouse_row['longitude']
+            lat2, lon2 = order_row['delivery_latitude'], order_row['delivery_longitude']
+            
+            # Convert to radians
+            lat1, lon1 = map(radians, [float(lat1), float(lon1)])
+            lat2, lon2 = map(radians, [float(lat2), float(lon2)])
+            
+            # Haversine formula
+            dlat = lat2 - lat1
+            dlon = lon2 - lon1
+            a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
+            c = 2 * atan2(sqrt(a), sqrt(1-a))
+            r = 6371  # Earth's radius in kilometers
+            
+            return c * r
+        except Exception as e:
+            self.logger.error(f"Error calculating distance: {str(e)}")
+            return float('inf')
+
+    @staticmethod
+    def _coordinates_key(*arrays: np.ndarray) -> str:
+        """Digest of coordinate arrays used as distance cache key"""
+        digest = hashlib.blake2b(digest_size=16)
+        for array in arrays:
+            digest.update(str(array.shape).encode())
+            digest.update(np.ascontiguousarray(array).tobytes())
+        return digest.hexdigest()
+
+    def distance_matrix(self, warehouses: pd.DataFrame, orders: pd.DataFrame) -> np.ndarray:
+        """Haversine distances (km) for every order x warehouse pair in one broadcast"""
+        wh_lat = warehouses['latitude'].to_numpy(dtype=float)
+        wh_lon = warehouses['longitude'].to_numpy(dtype=float)
+        order_lat = orders['delivery_latitude'].to_numpy(dtype=float)
+        order_lon = orders['delivery_longitude'].to_numpy(dtype=float)
+
+        key = self._coordinates_key(wh_lat, wh_lon, order_lat, order_lon)
+        if key in self._distance_cache:
+            self._distance_cache.move_to_end(key)
+            return self._distance_cache[key]
+
+        # Same haversine formula as calculate_distance, broadcast to (orders, warehouses)
+        # and evaluated in place to avoid full-size temporaries
+        lat1, lon1 = np.radians(wh_lat), np.radians(wh_lon)
+        lat2, lon2 = np.radians(order_lat)[:, np.newaxis], np.radians(order_lon)[:, np.newaxis]
+
+        distances = np.subtract(lat2, lat1)
+        distances *= 0.5
+        np.sin(distances, out=distances)
+        np.square(distances, out=distances)
+
+        dlon_term = np.subtract(lon2, lon1)
+        dlon_term *= 0.5
+        np.sin(dlon_term, out=dlon_term)
+        np.square(dlon_term, out=dlon_term)
+        dlon_term *= np.cos(lat2)
+        dlon_term *= np.cos(lat1)
+        distances += dlon_term
+        del dlon_term
+
+        np.clip(distances, 0, 1, out=distances)
+        np.sqrt(distances, out=distances)
+        np.arcsin(distances, out=distances)
+        distances *= 2 * EARTH_RADIUS_KM
+
+        # Invalid coordinates can never be selected
+        distances[~np.isfinite(distances)] = np.inf
+
+        self._distance_cache[key] = distances
+        while len(self._distance_cache) > self.distance_cache_size:
+            self._distance_cache.popitem(last=False)
+        return distances
+
+    def build_cost_matrix(self,
+                          warehouses: pd.DataFrame,
+                          orders: pd.DataFrame,
+                          lane_rates: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Build the orders x warehouses distance and cost matrices.
+
+        Args:
+            warehouses (pd.DataFrame): Warehouses with coordinates and storage_cost
+            orders (pd.DataFrame): Orders with delivery coordinates and quantity
+            lane_rates (Optional[np.ndarray]): Cost per km, broadcastable to
+                (orders, warehouses). Defaults to BASE_COST_PER_KM for every lane.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (distances, costs), both shaped (orders, warehouses)
+        """
+        distances = self.distance_matrix(warehouses, orders)
+        rates = BASE_COST_PER_KM if lane_rates is None else np.asarray(lane_rates, dtype=float)
+
+        costs = np.multiply(distances, rates)
+        costs += np.multiply.outer(
+            orders['quantity'].to_numpy(dtype=float),
+            warehouses['storage_cost'].to_numpy(dtype=float) * STORAGE_COST_FACTOR
+        )
+        costs[~np.isfinite(costs)] = np.inf
+        return distances, costs
+
+    def optimize(self,
+                 warehouses: pd.DataFrame,
+                 orders: pd.DataFrame,
+                 lane_rates: Optional[np.ndarray] = None,
+                 mode: str = 'greedy',
+                 stock: Optional[StockMatrix] = None,
+                 deadline: Optional[float] = None,
+                 use_warm_start: Optional[bool] = None) -> Dict[str, Any]:
+        """
+        Optimize inventory distribution
+
+        Args:
+            warehouses (pd.DataFrame): Warehouses with stock, capacity and coordinates
+            orders (pd.DataFrame): Pending orders to allocate
+            lane_rates (Optional[np.ndarray]): Optional per-lane cost per km, broadcastable
+                to (orders, warehouses) in the row order of orders, e.g. from
+                DataLoader.get_lane_rates
+            mode (str): 'greedy' assigns orders one at a time to the cheapest warehouse
+                with stock; 'milp' solves the assignment as a mixed-integer program
+                within solver_time and the configured utilization bounds; 'split' lets
+                one order be served from several warehouses via a transportation LP
+            stock (Optional[StockMatrix]): Per-product stock; orders then only draw on
+                warehouses holding their product_id ('greedy' and 'split' modes)
+            deadline (Optional[float]): time.time() at which greedy local search and
+                split-mode LP solves stop, solver_time from now by default; partitioned and streamed runs pass
+                their overall deadline so all sub-runs share one budget
+            use_warm_start (Optional[bool]): Start from, and remember, the latest plan
+                of this mode ('greedy' and 'milp'); defaults to the warm_start setting.
+                Partitioned and streamed runs turn it off for their sub-runs
+        """
+        if mode not in OPTIMIZATION_MODES:
+            raise ValueError(f"Unknown optimization mode: {mode}")
+        if stock is not None and mode not in PARTITIONED_MODES:
+            raise ValueError(f"Optimization mode cannot allocate per product: {mode}")
+
+        try:
+            optimization_start_time = time.time()
+            if use_warm_start is None:
+                use_warm_start = self.warm_start
+            warm_plan = None
+            if use_warm_start and stock is None and mode in WARM_START_MODES:
+                warm_plan = self._warm_plans.get(mode)
+            cache_key = self.results_key(warehouses, orders, lane_rates, mode, stock, warm_plan)
+            cached = self._cached_results(cache_key)
+            if cached is not None:
+                return cached
+
+            results = self._new_results()
+
+            # Sort orders by priority (urgent first) and size
+            processing_order = orders.reset_index(drop=True).sort_values(
+                by=['status', 'quantity'], 
+                ascending=[True, False]
+            ).index.to_numpy()
+            orders = orders.iloc[processing_order]
+            if lane_rates is not None and np.ndim(lane_rates) == 2 and np.shape(lane_rates)[0] > 1:
+                # Per-order rates follow their orders
+                lane_rates = np.asarray(lane_rates, dtype=float)[processing_order]
+
+            solver_metrics = {}
+            if deadline is None:
+                deadline = optimization_start_time + self.solver_time
+            warm_start = self._warm_start(warehouses, orders, warm_plan)
+            if stock is not None:
+                # Every product is allocated against its own stock column
+                solver_metrics = self._allocate_by_product(
+                    warehouses, orders, stock, lane_rates, mode, results, deadline
+                )
+            elif mode == 'greedy' and self._use_spatial_index(warehouses, lane_rates):
+                # Large networks only look at the nearest warehouses of each order
+                solver_metrics = self._allocate_greedy_spatial(
+                    warehouses, orders, lane_rates, results, deadline, warm_start
+                )
+            else:
+                # Price every order x warehouse lane up front
+                distances, costs = self.build_cost_matrix(warehouses, orders, lane_rates)
+
+                if mode == 'milp':
+                    solver_metrics = self._allocate_milp(
+                        warehouses, orders, distances, costs, results, optimization_start_time,
+                        warm_start
+                    )
+                elif mode == 'split':
+                    solver_metrics = self._allocate_split(
+                        warehouses, orders, distances, costs, results, deadline
+                    )
+                else:
+                    solver_metrics = self._allocate_greedy(
+                        warehouses, orders, distances, costs, results, deadline, warm_start
+                    )
+            if warm_start is not None:
+                solver_metrics['warm_started_orders'] = int((warm_start >= 0).sum())
+
+            # Calculate solving time and update status
+            results['solving_time'] = time.time() - optimization_start_time
+            if results['status'] == 'In Progress':
+                results['status'] = 'Completed'
+            
+            self._add_performance_metrics(results, len(orders))
+            results['performance_metrics'].update(solver_metrics)
+
+            self._store_results(cache_key, results)
+            if use_warm_start:
+                self._warm_plans[mode] = results['allocations'][['order_id', 'warehouse_id']]
+            return results
+
+        except Exception as e:
+            self.logger.error(f"Optimization error: {str(e)}")
+            raise ValueError(f"Optimization error: {str(e)}")
+
+    def optimize_partitioned(self,
+                             warehouses: pd.DataFrame,
+                             orders: pd.DataFrame,
+                             lane_rates: Optional[np.ndarray] = None,
+                             mode: str = 'greedy',
+                             max_workers: Optional[int] = None,
+                             snapshot: Optional[OptimizerSnapshot] = None) -> Dict[str, Any]:
+        """
+        Optimize every delivery region as an independent subproblem on a process pool.
+
+        A region only sees the warehouses among the nearest regional_candidates of
+        its orders. Stock of a warehouse shared by several regions is split by the
+        demand each region places on it; stock left after the regional runs is
+        offered to the remaining orders in a final coordination pass over all
+        warehouses. Local search in the regions stops halfway through solver_time
+        and in the coordination pass at its end, so the whole run shares one budget.
+        The status and solver_status are the worst of any regional or
+        coordination run.
+
+        Args:
+            warehouses (pd.DataFrame): Warehouses with stock, capacity and coordinates
+            orders (pd.DataFrame): Pending orders with a region column
+            lane_rates (Optional[np.ndarray]): Cost per km, scalar or one per warehouse
+            mode (str): 'greedy' or 'split', solved within each region as in optimize
+            max_workers (Optional[int]): Worker processes, defaults to partition_workers
+            snapshot (Optional[OptimizerSnapshot]): Snapshot the orders were read from;
+                workers then map their region's rows from it instead of receiving
+                pickled order frames
+        """
+        if mode not in PARTITIONED_MODES:
+            raise ValueError(f"Optimization mode cannot be partitioned by region: {mode}")
+        if lane_rates is not None and np.ndim(lane_rates) > 1 and np.shape(lane_rates)[0] > 1:
+            raise ValueError("Per-order lane rates cannot be partitioned by region")
+
+        try:
+            optimization_start_time = time.time()
+            warehouses = warehouses.reset_index(drop=True)
+            orders = orders.sort_values(
+                by=['status', 'quantity'],
+                ascending=[True, False]
+            ).reset_index(drop=True)
+            if lane_rates is not None and np.ndim(lane_rates) > 0:
+                lane_rates = np.asarray(lane_rates, dtype=float).reshape(-1)
+
+            subproblems = self._regional_subproblems(warehouses, orders, lane_rates)
+            workers = min(max_workers or self.partition_workers, len(subproblems))
+            settings = self._settings()
+            deadline = optimization_start_time + self.solver_time
+            regional_deadline = optimization_start_time + self.solver_time / 2
+            if workers > 1 and snapshot is not None:
+                # Only snapshot row numbers cross the process boundary
+                regional_warehouses, regional_orders, regional_rates = zip(*subproblems)
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    regional_results = list(pool.map(
+                        _optimize_snapshot_region, repeat(settings), repeat(snapshot.path),
+                        regional_warehouses,
+                        [region['order_id'].to_numpy() for region in regional_orders],
+                        regional_rates, repeat(mode), repeat(regional_deadline)
+                    ))
+            elif workers > 1:
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    regional_results = list(pool.map(
+                        _optimize_region, repeat(settings), *zip(*subproblems), repeat(mode),
+                        repeat(regional_deadline)
+                    ))
+            else:
+                regional_results = [
+                    _optimize_region(settings, *subproblem, mode, regional_deadline)
+                    for subproblem in subproblems
+                ]
+
+            allocations = pd.concat(
+                [regional['allocations'] for regional in regional_results]
+                or [self._new_results()['allocations']],
+                ignore_index=True
+            )
+
+            # Coordination pass: leftover stock anywhere against whatever is still open
+            quantities = orders['quantity'].to_numpy()
+            stock = warehouses['current_stock'].to_numpy()
+            flow_orders, flow_warehouses = self._flow_positions(warehouses, orders, allocations)
+            shipped_quantities = allocations['quantity'].to_numpy(dtype=float)
+            served = np.bincount(flow_orders, weights=shipped_quantities, minlength=len(orders))
+            shipped = np.bincount(flow_warehouses, weights=shipped_quantities, minlength=len(warehouses))
+            remaining_stock = (stock - shipped).astype(stock.dtype)
+            open_positions = np.flatnonzero(served < quantities)
+            sub_runs = list(regional_results)
+            if mode == 'greedy':
+                # Whole orders only fit where the residual stock covers them
+                open_positions = open_positions[quantities[open_positions] <= remaining_stock.max(initial=0)]
+            if open_positions.size and remaining_stock.max(initial=0) > 0:
+                coordination = self.optimize(
+                    warehouses.assign(current_stock=remaining_stock),
+                    orders.iloc[open_positions].assign(
+                        quantity=(quantities[open_positions] - served[open_positions]).astype(quantities.dtype)
+                    ),
+                    lane_rates, mode, deadline=deadline, use_warm_start=False
+                )
+                sub_runs.append(coordination)
+                allocations = pd.concat([allocations, coordination['allocations']], ignore_index=True)
+                flow_orders, flow_warehouses = self._flow_positions(warehouses, orders, allocations)
+
+            flow_quantities = allocations['quantity'].to_numpy().astype(quantities.dtype)
+            results = self._new_results()
+            self._record_flows(
+                warehouses, orders, flow_orders, flow_warehouses, flow_quantities,
+                allocations['cost'].to_numpy(), allocations['distance'].to_numpy(), results,
+                'Insufficient stock across all warehouses'
+            )
+            if mode == 'split':
+                self._record_split_orders(warehouses, orders, flow_orders, flow_warehouses,
+                                          flow_quantities, results)
+
+            results['solving_time'] = time.time() - optimization_start_time
+            results['status'] = max(
+                (run['status'] for run in sub_runs), key=RUN_STATUSES.index, default='Completed'
+            )
+            self._add_performance_metrics(results, len(orders))
+            solver_statuses = [
+                run['performance_metrics']['solver_status'] for run in sub_runs
+                if 'solver_status' in run['performance_metrics']
+            ]
+            if solver_statuses:
+                results['performance_metrics']['solver_status'] = max(
+                    solver_statuses, key=SOLVER_STATUSES.index
+                )
+            results['performance_metrics'].update({
+                'regions': len(subproblems),
+                'workers': max(workers, 1),
+                'coordinated_orders': int(open_positions.size)
+            })
+            return results
+
+        except Exception as e:
+            self.logger.error(f"Optimization error: {str(e)}")
+            raise ValueError(f"Optimization error: {str(e)}")
+
+    def optimize_stream(self,
+                        warehouses: pd.DataFrame,
+                        order_chunks: Iterable[pd.DataFrame],
+                        lane_rates: Optional[np.ndarray] = None,
+                        mode: str = 'greedy') -> Iterator[Dict[str, Any]]:
+        """
+        Optimize an iterator of order chunks, yielding one result batch per chunk.
+
+        Only the remaining warehouse stock is carried between chunks, so memory
+        is bounded by the chunk size. Priority ordering applies within a chunk;
+        earlier chunks are served first. Local search shares one solver_time
+        across the whole stream; chunks after it ran out get plain greedy plans.
+        Each batch has the format returned by optimize, with initial_stock being
+        the stock at the start of the chunk.
+
+        Args:
+            warehouses (pd.DataFrame): Warehouses with stock, capacity and coordinates
+            order_chunks (Iterable[pd.DataFrame]): Order chunks, e.g. from pd.read_csv(chunksize=...)
+            lane_rates (Optional[np.ndarray]): Cost per km, scalar or one per warehouse
+            mode (str): 'greedy' or 'split', solved within each chunk as in optimize
+        """
+        if mode not in PARTITIONED_MODES:
+            raise ValueError(f"Optimization mode cannot be streamed: {mode}")
+        if lane_rates is not None and np.ndim(lane_rates) > 1 and np.shape(lane_rates)[0] > 1:
+            raise ValueError("Per-order lane rates cannot be streamed")
+
+        warehouses = warehouses.reset_index(drop=True)
+        warehouse_positions = {
+            warehouse_id: position for position, warehouse_id in enumerate(warehouses['warehouse_id'])
+        }
+        remaining_stock = warehouses['current_stock'].to_numpy(copy=True)
+        deadline = time.time() + self.solver_time
+
+        for chunk_number, chunk in enumerate(order_chunks):
+            if chunk.empty:
+                continue
+            batch = self.optimize(
+                warehouses.assign(current_stock=remaining_stock), chunk, lane_rates, mode,
+                deadline=deadline, use_warm_start=False
+            )
+            for warehouse_id, utilization in batch['warehouse_utilization'].items():
+                remaining_stock[warehouse_positions[warehouse_id]] = utilization['remaining_stock']
+            batch['performance_metrics']['chunk'] = chunk_number
+            yield batch
+
+    def optimize_snapshot(self,
+                          snapshot,
+                          lane_rates: Optional[np.ndarray] = None,
+                          mode: str = 'greedy',
+                          partitioned: bool = False,
+                          max_workers: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Optimize the inputs of a memory-mapped OptimizerSnapshot.
+
+        The numeric columns of the frames are views on the mapped files, but the
+        run itself still works in memory: optimize sorts a copy of the orders
+        and prices lanes in order x warehouse arrays. Partitioned runs hand workers snapshot row numbers instead of
+        pickled frames, and each worker reads only its region's rows. Results
+        carry the original order IDs.
+
+        Args:
+            snapshot: OptimizerSnapshot or the path of a snapshot directory
+            lane_rates (Optional[np.ndarray]): Optional per-lane cost per km
+            mode (str): Optimization mode as in optimize
+            partitioned (bool): Solve by region on a process pool as in optimize_partitioned
+            max_workers (Optional[int]): Worker processes for partitioned runs
+        """
+        if not isinstance(snapshot, OptimizerSnapshot):
+            snapshot = OptimizerSnapshot(snapshot)
+        warehouses, orders = snapshot.warehouses(), snapshot.orders()
+        if partitioned:
+            results = self.optimize_partitioned(
+                warehouses, orders, lane_rates, mode, max_workers, snapshot=snapshot
+            )
+        else:
+            results = self.optimize(warehouses, orders, lane_rates, mode)
+        return snapshot.decode_results(results)
+
+    def _regional_subproblems(self,
+                              warehouses: pd.DataFrame,
+                              orders: pd.DataFrame,
+                              lane_rates: Optional[np.ndarray]) -> List[Tuple]:
+        """
+        Split orders by region and give each region its share of nearby warehouses.
+
+        Returns:
+            List[Tuple]: (warehouses, orders, lane_rates) per region with any orders
+        """
+        tree, indexed = self.spatial_index(warehouses)
+        k = min(self.regional_candidates, len(indexed))
+        if k == 0 or orders.empty:
+            return []
+        points = np.nan_to_num(_unit_vectors(
+            orders['delivery_latitude'].to_numpy(dtype=float),
+            orders['delivery_longitude'].to_numpy(dtype=float)
+        ))
+        _, neighbors = tree.query(points, k=k)
+        candidates = indexed[np.reshape(neighbors, (len(orders), k))]
+
+        regions, region_codes = np.unique(orders['region'].astype(object).fillna('Unknown').astype(str), return_inverse=True)
+        quantities = orders['quantity'].to_numpy(dtype=float)
+        demand = np.zeros((len(regions), len(warehouses)))
+        np.add.at(demand, (region_codes[:, np.newaxis], candidates), quantities[:, np.newaxis])
+
+        # Shared warehouses: stock split by each region's demand on them
+        stock = warehouses['current_stock'].to_numpy()
+        total_demand = demand.sum(axis=0)
+        shares = np.divide(demand, total_demand, out=np.zeros_like(demand), where=total_demand > 0)
+        regional_stock = np.floor(shares * stock).astype(stock.dtype)
+
+        subproblems = []
+        for region in range(len(regions)):
+            region_rows = np.flatnonzero(region_codes == region)
+            region_warehouses = np.flatnonzero(demand[region] > 0)
+            if region_warehouses.size == 0:
+                continue
+            rates = lane_rates
+            if lane_rates is not None and np.ndim(lane_rates) > 0:
+                rates = lane_rates[region_warehouses]
+            subproblems.append((
+                warehouses.iloc[region_warehouses].assign(current_stock=regional_stock[region, region_warehouses]),
+                orders.iloc[region_rows],
+                rates
+            ))
+        return subproblems
+
+    @staticmethod
+    def _flow_positions(warehouses: pd.DataFrame,
+                        orders: pd.DataFrame,
+                        allocations: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+        """Order and warehouse row positions of every allocation row"""
+        return (
+            pd.Index(orders['order_id']).get_indexer(allocations['order_id']),
+            pd.Index(warehouses['warehouse_id']).get_indexer(allocations['warehouse_id'])
+        )
+
+    def _settings(self) -> Dict[str, Any]:
+        """Public tuning attributes, e.g. to configure a worker's optimizer"""
+        return {
+            name: value for name, value in vars(self).items()
+            if not name.startswith('_') and name != 'logger'
+        }
+
+    def results_key(self,
+                    warehouses: pd.DataFrame,
+                    orders: pd.DataFrame,
+                    lane_rates: Optional[np.ndarray] = None,
+                    mode: str = 'greedy',
+                    stock: Optional[StockMatrix] = None,
+                    warm_plan: Optional[pd.DataFrame] = None) -> str:
+        """Content hash of everything an optimize run depends on, warm-start plan included"""
+        digest = hashlib.blake2b(digest_size=16)
+        # Per-product runs also depend on which product each order asks for
+        order_columns = ORDER_KEY_COLUMNS + (['product_id'] if stock is not None else [])
+        for frame, columns in ((warehouses, WAREHOUSE_KEY_COLUMNS), (orders, order_columns)):
+            present = [column for column in columns if column in frame.columns]
+            digest.update(repr(present).encode())
+            digest.update(pd.util.hash_pandas_object(frame[present], index=False).to_numpy().tobytes())
+        if lane_rates is not None:
+            rates = np.asarray(lane_rates, dtype=float)
+            digest.update(str(rates.shape).encode())
+            digest.update(np.ascontiguousarray(rates).tobytes())
+        if stock is not None:
+            digest.update(pd.util.hash_array(stock.warehouse_index.to_numpy()).tobytes())
+            digest.update(pd.util.hash_array(stock.product_index.to_numpy()).tobytes())
+            for array in (stock.matrix.indptr, stock.matrix.indices, stock.matrix.data):
+                digest.update(np.ascontiguousarray(array).tobytes())
+        if warm_plan is not None:
+            digest.update(b'warm_plan')
+            digest.update(pd.util.hash_pandas_object(warm_plan, index=False).to_numpy().tobytes())
+        settings = {
+            name: value for name, value in self._settings().items()
+            if not name.startswith('result_cache')
+        }
+        digest.update(repr((mode, sorted(settings.items()))).encode())
+        return digest.hexdigest()
+
+    def _cached_results(self, key: str) -> Optional[Dict[str, Any]]:
+        """Copy of a cached result from memory or disk, None on a miss"""
+        results = self._result_cache.get(key)
+        if results is not None:
+            self._result_cache.move_to_end(key)
+        elif self.result_cache_dir:
+            path = os.path.join(self.result_cache_dir, f"{key}.json")
+            try:
+                with open(path) as f:
+                    results = json.load(f)
+                for name in RESULT_MAPPINGS:
+                    if name in results:
+                        results[name] = {item_id: value for item_id, value in results[name]}
+                results['allocations'] = pd.read_parquet(
+                    os.path.join(self.result_cache_dir, f"{key}.parquet")
+                )
+                results['allocation_plan'] = AllocationPlanView(results['allocations'])
+                os.utime(path)
+            except FileNotFoundError:
+                return None
+            except Exception as e:
+                self.logger.warning(f"Could not read cached result {path}: {str(e)}")
+                return None
+            self._remember_results(key, results)
+        if results is None:
+            return None
+
+        cached = self._copy_results(results)
+        cached['performance_metrics']['cache_hit'] = True
+        return cached
+
+    @staticmethod
+    def _copy_results(results: Dict[str, Any]) -> Dict[str, Any]:
+        """Copy of a result that callers can change without touching the cache"""
+        copied = dict(results)
+        copied['allocations'] = results['allocations'].copy()
+        copied['allocation_plan'] = AllocationPlanView(copied['allocations'])
+        copied['unfulfilled_orders'] = list(results['unfulfilled_orders'])
+        copied['warehouse_utilization'] = dict(results['warehouse_utilization'])
+        copied['performance_metrics'] = dict(results['performance_metrics'])
+        if 'split_orders' in results:
+            copied['split_orders'] = dict(results['split_orders'])
+        return copied
+
+    def _remember_results(self, key: str, results: Dict[str, Any]) -> None:
+        """Keep results in the in-memory LRU"""
+        if self.result_cache_size <= 0:
+            return
+        self._result_cache[key] = results
+        self._result_cache.move_to_end(key)
+        while len(self._result_cache) > self.result_cache_size:
+            self._result_cache.popitem(last=False)
+
+    def _store_results(self, key: str, results: Dict[str, Any]) -> None:
+        """Cache a copy of a fresh result"""
+        self._remember_results(key, self._copy_results(results))
+        if not self.result_cache_dir:
+            return
+        try:
+            os.makedirs(self.result_cache_dir, exist_ok=True)
+            summary = {
+                name: value for name, value in results.items()
+                if name not in ('allocations', 'allocation_plan')
+            }
+            for name in RESULT_MAPPINGS:
+                if name in summary:
+                    summary[name] = list(summary[name].items())
+            base = os.path.join(self.result_cache_dir, key)
+            results['allocations'].to_parquet(f"{base}.parquet", index=False)
+            # The JSON file is written last; an entry is complete once it exists
+            with open(f"{base}.json", 'w') as f:
+                json.dump(summary, f, default=self._json_value)
+            entries = sorted(
+                (entry for entry in os.scandir(self.result_cache_dir) if entry.name.endswith('.json')),
+                key=lambda entry: entry.stat().st_mtime
+            )
+            for entry in entries[:max(len(entries) - self.result_cache_disk_entries, 0)]:
+                os.remove(entry.path)
+                os.remove(f"{entry.path[:-len('.json')]}.parquet")
+        except (OSError, TypeError, ValueError) as e:
+            self.logger.warning(f"Could not write result cache: {str(e)}")
+
+    @staticmethod
+    def _json_value(value: Any) -> Any:
+        """JSON form of the numpy scalars in results"""
+        if isinstance(value, np.generic):
+            return value.item()
+        raise TypeError(f"Cannot cache a {type(value).__name__} result value")
+
+    @staticmethod
+    def _warm_start(warehouses: pd.DataFrame,
+                    orders: pd.DataFrame,
+                    plan: Optional[pd.DataFrame]) -> Optional[np.ndarray]:
+        """
+        Warehouse position per order from an earlier plan of the same mode.
+
+        Returns:
+            Optional[np.ndarray]: -1 for orders the plan did not serve, None when
+                there is no plan to start from
+        """
+        if plan is None or plan.empty:
+            return None
+        plan = plan.drop_duplicates('order_id', keep=False)
+        rows = pd.Index(plan['order_id']).get_indexer(orders['order_id'])
+        warm_start = pd.Index(warehouses['warehouse_id']).get_indexer(plan['warehouse_id'])[rows]
+        warm_start[rows < 0] = -1
+        if not (warm_start >= 0).any():
+            return None
+        return warm_start
+
+    def _new_results(self) -> Dict[str, Any]:
+        """Empty results dictionary in the format returned by optimize"""
+        allocations = pd.DataFrame({column: [] for column in ALLOCATION_COLUMNS})
+        return {
+            'allocations': allocations,
+            'allocation_plan': AllocationPlanView(allocations),
+            'warehouse_utilization': {},
+            'unfulfilled_orders': [],
+            'total_cost': 0,
+            'solving_time': 0,
+            'status': 'In Progress',
+            'optimization_timestamp': self.current_datetime,
+            'optimization_user': self.current_user
+        }
+
+    def results_from_flows(self,
+                           warehouses: pd.DataFrame,
+                           orders: pd.DataFrame,
+                           flow_orders: np.ndarray,
+                           flow_warehouses: np.ndarray,
+                           flow_quantities: np.ndarray,
+                           flow_costs: np.ndarray,
+                           flow_distances: np.ndarray,
+                           solving_time: float,
+                           unfulfilled_reason: str = 'Insufficient stock across all warehouses'
+                           ) -> Dict[str, Any]:
+        """
+        Completed results in the format returned by optimize, built from a plan
+        made outside the optimizer (e.g. by OptimizationSession).
+
+        Args:
+            warehouses (pd.DataFrame): Warehouses the flows draw on
+            orders (pd.DataFrame): Orders in processing order
+            flow_orders (np.ndarray): Order position of each shipment
+            flow_warehouses (np.ndarray): Warehouse position of each shipment
+            flow_quantities (np.ndarray): Quantity of each shipment
+            flow_costs (np.ndarray): Cost of each shipment
+            flow_distances (np.ndarray): Distance of each shipment in km
+            solving_time (float): Seconds spent planning
+            unfulfilled_reason (str): Reason recorded for orders not fully served
+
+        Returns:
+            Dict[str, Any]: Results with allocations, unfulfilled orders and performance metrics
+        """
+        results = self._new_results()
+        self._record_flows(
+            warehouses, orders, flow_orders, flow_warehouses, flow_quantities,
+            flow_costs, flow_distances, results, unfulfilled_reason
+        )
+        results['solving_time'] = solving_time
+        results['status'] = 'Completed'
+        self._add_performance_metrics(results, len(orders))
+        return results
+
+    @staticmethod
+    def _add_performance_metrics(results: Dict[str, Any], total_orders: int) -> None:
+        """Add fulfillment and cost metrics to filled-in results"""
+        fulfilled = total_orders - len(results['unfulfilled_orders'])
+        results['performance_metrics'] = {
+            'total_orders': total_orders,
+            'fulfilled_orders': fulfilled,
+            'fulfillment_rate': fulfilled / total_orders * 100 if total_orders > 0 else 0,
+            'average_cost_per_order': (
+                results['total_cost'] / fulfilled if fulfilled > 0 else 0
+            )
+        }
+
+    def _allocate_greedy(self,
+                         warehouses: pd.DataFrame,
+                         orders: pd.DataFrame,
+                         distances: np.ndarray,
+                         costs: np.ndarray,
+                         results: Dict[str, Any],
+                         deadline: Optional[float] = None,
+                         warm_start: Optional[np.ndarray] = None) -> Dict[str, Any]:
+        """
+        Assign each order in turn to the cheapest warehouse that can still cover it
+        (or its warm-start warehouse), then improve the plan by local search until
+        deadline when one is given
+        """
+        quantities = orders['quantity'].to_numpy()
+        stock = warehouses['current_stock'].to_numpy(copy=True)
+        assignments = self.greedy_assign(costs, quantities, stock, warm_start)
+
+        metrics = {}
+        if self.local_search and deadline is not None:
+            metrics = self._improve_dense(costs, distances, quantities, stock, assignments, deadline)
+
+        self._record_assignments(warehouses, orders, assignments, distances, costs, results,
+                                 'Insufficient stock across all warehouses')
+        return metrics
+
+    def _improve_dense(self,
+                       costs: np.ndarray,
+                       distances: np.ndarray,
+                       quantities: np.ndarray,
+                       stock: np.ndarray,
+                       assignments: np.ndarray,
+                       deadline: float) -> Dict[str, Any]:
+        """Local search over each order's cheapest lanes of a dense cost matrix"""
+        if costs.size == 0:
+            return {}
+        k = min(self.local_search_candidates, costs.shape[1])
+        lane_warehouses = np.argpartition(costs, k - 1, axis=1)[:, :k]
+        served = assignments >= 0
+        rows = np.arange(costs.shape[0])
+        order_costs = np.where(served, costs[rows, np.maximum(assignments, 0)], np.inf)
+        order_distances = np.where(served, distances[rows, np.maximum(assignments, 0)], np.inf)
+        return self._improve_assignments(
+            lane_warehouses,
+            np.take_along_axis(costs, lane_warehouses, axis=1),
+            np.take_along_axis(distances, lane_warehouses, axis=1),
+            quantities, stock, assignments, order_costs, order_distances, deadline
+        )
+
+    def _allocate_by_product(self,
+                             warehouses: pd.DataFrame,
+                             orders: pd.DataFrame,
+                             stock: StockMatrix,
+                             lane_rates: Optional[np.ndarray],
+                             mode: str,
+                             results: Dict[str, Any],
+                             deadline: float) -> Dict[str, Any]:
+        """
+        Allocate every product against its own column of the stock matrix.
+
+        Products never share stock, so each one is an independent subproblem
+        priced only over the warehouses that carry it. Greedy plans are then
+        improved by one local search over all products, in which every stocked
+        warehouse/product pair acts as its own warehouse.
+        """
+        stock = stock.align(warehouses['warehouse_id'])
+        product_codes = stock.product_index.get_indexer(orders['product_id'])
+        wh_lat = warehouses['latitude'].to_numpy(dtype=float)
+        wh_lon = warehouses['longitude'].to_numpy(dtype=float)
+        storage = warehouses['storage_cost'].to_numpy(dtype=float) * STORAGE_COST_FACTOR
+        order_lat = orders['delivery_latitude'].to_numpy(dtype=float)
+        order_lon = orders['delivery_longitude'].to_numpy(dtype=float)
+        quantities = orders['quantity'].to_numpy()
+
+        flows = []  # (order positions, warehouse positions, quantities, costs, distances)
+        metrics = {'products': 0, 'stocked_lanes': stock.nnz}
+
+        # Greedy state over stocked pairs (positions in the CSC data array)
+        remaining = stock.matrix.data.copy()
+        pairs = np.full(len(orders), -1, dtype=np.int64)
+        order_costs = np.full(len(orders), np.inf)
+        order_distances = np.full(len(orders), np.inf)
+        k = self.local_search_candidates
+        lane_pairs = np.full((len(orders), k), -1, dtype=np.int64)
+        lane_costs = np.full((len(orders), k), np.inf)
+        lane_distances = np.full((len(orders), k), np.inf)
+        # Stable sort keeps the priority order within each product
+        by_product = np.argsort(product_codes, kind='stable')
+        boundaries = np.flatnonzero(np.diff(product_codes[by_product])) + 1
+        for group in np.split(by_product, boundaries):
+            if group.size == 0 or product_codes[group[0]] < 0:
+                continue
+            carriers, available = stock.product_stock(product_codes[group[0]])
+            if carriers.size == 0:
+                continue
+            metrics['products'] += 1
+
+            distances = _haversine_km(
+                wh_lat[carriers], wh_lon[carriers],
+                order_lat[group][:, np.newaxis], order_lon[group][:, np.newaxis]
+            )
+            distances[~np.isfinite(distances)] = np.inf
+            costs = distances * self._lane_rates_for(lane_rates, group, carriers)
+            costs += np.multiply.outer(quantities[group].astype(float), storage[carriers])
+            costs[~np.isfinite(costs)] = np.inf
+
+            if mode == 'split':
+                product_results = self._new_results()
+                product_warehouses = warehouses.iloc[carriers].assign(current_stock=available)
+                product_orders = orders.iloc[group]
+                self._allocate_split(product_warehouses, product_orders, distances, costs,
+                                     product_results, deadline)
+                allocations = product_results['allocations']
+                rows, columns = self._flow_positions(product_warehouses, product_orders, allocations)
+                flows.append((group[rows], carriers[columns], allocations['quantity'].to_numpy(),
+                              allocations['cost'].to_numpy(), allocations['distance'].to_numpy()))
+                continue
+
+            start = stock.matrix.indptr[product_codes[group[0]]]
+            assignments = self.greedy_assign(
+                costs, quantities[group], remaining[start:start + carriers.size]
+            )
+            served = np.flatnonzero(assignments >= 0)
+            chosen = assignments[served]
+            pairs[group[served]] = start + chosen
+            order_costs[group[served]] = costs[served, chosen]
+            order_distances[group[served]] = distances[served, chosen]
+
+            product_k = min(k, carriers.size)
+            cheapest = np.argpartition(costs, product_k - 1, axis=1)[:, :product_k]
+            lane_pairs[group, :product_k] = start + cheapest
+            lane_costs[group, :product_k] = np.take_along_axis(costs, cheapest, axis=1)
+            lane_distances[group, :product_k] = np.take_along_axis(distances, cheapest, axis=1)
+
+        if mode == 'greedy':
+            if self.local_search:
+                metrics.update(self._improve_assignments(
+                    lane_pairs, lane_costs, lane_distances, quantities, remaining,
+                    pairs, order_costs, order_distances, deadline
+                ))
+            served = np.flatnonzero(pairs >= 0)
+            flows.append((served, stock.matrix.indices[pairs[served]], quantities[served],
+                          order_costs[served], order_distances[served]))
+
+        if flows:
+            flow_orders, flow_warehouses, flow_quantities, flow_costs, flow_distances = map(
+                np.concatenate, zip(*flows)
+            )
+        else:
+            flow_orders = flow_warehouses = np.array([], dtype=np.int64)
+            flow_quantities = np.array([], dtype=quantities.dtype)
+            flow_costs = flow_distances = np.array([])
+        self._record_flows(
+            warehouses.assign(current_stock=stock.totals()), orders,
+            flow_orders, flow_warehouses, flow_quantities.astype(quantities.dtype),
+            flow_costs, flow_distances, results, 'Insufficient product stock across all warehouses'
+        )
+        if mode == 'split':
+            self._record_split_orders(warehouses, orders, flow_orders, flow_warehouses,
+                                      flow_quantities, results)
+        return metrics
+
+    @staticmethod
+    def _lane_rates_for(lane_rates: Optional[np.ndarray], rows: np.ndarray, columns: np.ndarray):
+        """Slice lane rates broadcastable to (orders, warehouses) down to a sub-block"""
+        if lane_rates is None:
+            return BASE_COST_PER_KM
+        rates = np.asarray(lane_rates, dtype=float)
+        if rates.ndim == 0:
+            return rates
+        if rates.shape[-1] > 1:
+            rates = rates[..., columns]
+        if rates.ndim == 2 and rates.shape[0] > 1:
+            rates = rates[rows]
+        return rates
+
+    @staticmethod
+    def greedy_assign(costs: np.ndarray,
+                       quantities: np.ndarray,
+                       stock: np.ndarray,
+                       preferred: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Greedy assignment over plain arrays.
+
+        Args:
+            costs (np.ndarray): (orders, warehouses) cost matrix in processing order
+            quantities (np.ndarray): Order quantities in processing order
+            stock (np.ndarray): Warehouse stock, decremented in place
+            preferred (Optional[np.ndarray]): Warehouse index per order (-1 = none)
+                taken whenever it still has enough stock
+
+        Returns:
+            np.ndarray: Warehouse index per order, -1 where no warehouse has enough stock
+        """
+        assignments = np.full(len(quantities), -1, dtype=np.int64)
+        if costs.shape[1] == 0:
+            return assignments
+        for position, quantity in enumerate(quantities):
+            if preferred is not None:
+                w = preferred[position]
+                if w >= 0 and stock[w] >= quantity and costs[position, w] < np.inf:
+                    assignments[position] = w
+                    stock[w] -= quantity
+                    continue
+            order_costs = np.where(stock >= quantity, costs[position], np.inf)
+            best = order_costs.argmin()
+            if order_costs[best] < np.inf:
+                assignments[position] = best
+                stock[best] -= quantity
+        return assignments
+
+    def spatial_index(self, warehouses: pd.DataFrame) -> Tuple[cKDTree, np.ndarray]:
+        """
+        KD-tree over warehouse positions on the unit sphere.
+
+        The tree is reused across calls until the warehouse coordinates change.
+
+        Returns:
+            Tuple[cKDTree, np.ndarray]: The tree and the warehouse row positions it indexes
+        """
+        lat = warehouses['latitude'].to_numpy(dtype=float)
+        lon = warehouses['longitude'].to_numpy(dtype=float)
+        key = self._coordinates_key(lat, lon)
+        if self._spatial_index is None or self._spatial_index[0] != key:
+            points = _unit_vectors(lat, lon)
+            indexed = np.flatnonzero(np.isfinite(points).all(axis=1))
+            self._spatial_index = (key, cKDTree(points[indexed]), indexed)
+        return self._spatial_index[1], self._spatial_index[2]
+
+    def _use_spatial_index(self, warehouses: pd.DataFrame, lane_rates: Optional[np.ndarray]) -> bool:
+        """Spatial search needs a single cost per km across all lanes"""
+        return (
+            len(warehouses) >= self.spatial_index_threshold
+            and (lane_rates is None or np.ndim(lane_rates) == 0)
+        )
+
+    def _allocate_greedy_spatial(self,
+                                 warehouses: pd.DataFrame,
+                                 orders: pd.DataFrame,
+                                 lane_rate: Optional[float],
+                                 results: Dict[str, Any],
+                                 deadline: Optional[float] = None,
+                                 warm_start: Optional[np.ndarray] = None) -> Dict[str, Any]:
+        """
+        Greedy allocation that only prices the nearest warehouses of each order.
+
+        Every warehouse beyond the k-th nearest is at least that far away, so its
+        cost is bounded below by rate * d_k + cheapest storage term. The search
+        widens only while that bound could still beat the best candidate, which
+        gives exactly the same assignment as pricing every warehouse.
+        """
+        tree, indexed = self.spatial_index(warehouses)
+        rate = BASE_COST_PER_KM if lane_rate is None else float(lane_rate)
+        wh_lat = warehouses['latitude'].to_numpy(dtype=float)
+        wh_lon = warehouses['longitude'].to_numpy(dtype=float)
+        storage = warehouses['storage_cost'].to_numpy(dtype=float) * STORAGE_COST_FACTOR
+        stock = warehouses['current_stock'].to_numpy(copy=True)
+        min_storage = storage[indexed].min() if indexed.size else 0.0
+
+        order_lat = orders['delivery_latitude'].to_numpy(dtype=float)
+        order_lon = orders['delivery_longitude'].to_numpy(dtype=float)
+        quantities = orders['quantity'].to_numpy()
+        order_points = _unit_vectors(order_lat, order_lon)
+        located = np.flatnonzero(np.isfinite(order_points).all(axis=1))
+
+        assignments = np.full(len(orders), -1, dtype=np.int64)
+        order_costs = np.zeros(len(orders))
+        order_distances = np.zeros(len(orders))
+        k = min(self.spatial_candidates, indexed.size)
+        if k:
+            chords, nearest = tree.query(order_points[located], k)
+            chords, nearest = chords.reshape(-1, k), nearest.reshape(-1, k)
+
+        max_stock = stock[indexed].max() if indexed.size else 0
+        for row, position in enumerate(located if k else []):
+            quantity = quantities[position]
+            if quantity > max_stock:
+                continue
+            candidates, radius = indexed[nearest[row]], chords[row, -1]
+            preferred = -1 if warm_start is None else warm_start[position]
+            if preferred >= 0 and stock[preferred] >= quantity:
+                # Keep the warm-start warehouse while it has stock
+                candidates, radius = warm_start[position:position + 1], np.inf
+            while True:
+                distances = _haversine_km(
+                    wh_lat[candidates], wh_lon[candidates], order_lat[position], order_lon[position]
+                )
+                costs = rate * distances + storage[candidates] * quantity
+                costs[stock[candidates] < quantity] = np.inf
+                best_cost = costs.min()
+                if candidates.size >= indexed.size:
+                    break
+                bound = rate * _chord_to_km(radius) + min_storage * quantity
+                if best_cost < bound:
+                    break
+                widened = candidates.size * 4
+                if widened >= indexed.size:
+                    candidates = indexed
+                    continue
+                chord_row, index_row = tree.query(order_points[position], widened)
+                candidates, radius = indexed[index_row], chord_row[-1]
+
+            if best_cost < np.inf:
+                # Ties go to the lowest warehouse position, as in the dense scan
+                best = np.flatnonzero(costs == best_cost)
+                best = best[np.argmin(candidates[best])]
+                w = candidates[best]
+                assignments[position] = w
+                order_costs[position] = costs[best]
+                order_distances[position] = distances[best]
+                if stock[w] == max_stock:
+                    stock[w] -= quantity
+                    max_stock = stock[indexed].max()
+                else:
+                    stock[w] -= quantity
+
+        metrics = {}
+        if self.local_search and deadline is not None and k and located.size:
+            # Local search over each order's nearest warehouses
+            lane_warehouses = np.full((len(orders), k), -1, dtype=np.int64)
+            lane_warehouses[located] = indexed[nearest]
+            lane_distances = np.full((len(orders), k), np.inf)
+            lane_distances[located] = _haversine_km(
+                wh_lat[indexed[nearest]], wh_lon[indexed[nearest]],
+                order_lat[located][:, np.newaxis], order_lon[located][:, np.newaxis]
+            )
+            lane_costs = rate * lane_distances + storage[lane_warehouses] * quantities[:, np.newaxis]
+            lane_costs[lane_warehouses < 0] = np.inf
+            unserved = assignments < 0
+            order_costs[unserved] = np.inf
+            order_distances[unserved] = np.inf
+            metrics = self._improve_assignments(
+                lane_warehouses, lane_costs, lane_distances, quantities, stock,
+                assignments, order_costs, order_distances, deadline
+            )
+
+        served = np.flatnonzero(assignments >= 0)
+        self._record_flows(
+            warehouses, orders, served, assignments[served], quantities[served],
+            order_costs[served], order_distances[served], results,
+            'Insufficient stock across all warehouses'
+        )
+        return metrics
+
+    @staticmethod
+    def _improve_assignments(lane_warehouses: np.ndarray,
+                             lane_costs: np.ndarray,
+                             lane_distances: np.ndarray,
+                             quantities: np.ndarray,
+                             stock: np.ndarray,
+                             assignments: np.ndarray,
+                             order_costs: np.ndarray,
+                             order_distances: np.ndarray,
+                             deadline: float) -> Dict[str, Any]:
+        """
+        Anytime local search over an assignment.
+
+        Orders move to a cheaper candidate lane with spare stock (relocate) or
+        trade warehouses with an order at that lane when neither fits alone
+        (swap); unserved orders are placed wherever stock has come free. Each
+        accepted move is applied immediately, so stopping at the deadline
+        always leaves the best plan found so far.
+
+        Args:
+            lane_warehouses (np.ndarray): (orders, k) candidate warehouse indexes, -1 for none
+            lane_costs (np.ndarray): (orders, k) cost of each candidate lane, inf if unusable
+            lane_distances (np.ndarray): (orders, k) distance of each candidate lane
+            quantities (np.ndarray): Order quantities
+            stock (np.ndarray): Remaining warehouse stock, updated in place
+            assignments (np.ndarray): Warehouse index per order (-1 = unserved), updated in place
+            order_costs (np.ndarray): Cost of each order's current lane, updated in place
+            order_distances (np.ndarray): Distance of each order's current lane, updated in place
+            deadline (float): time.time() at which to stop
+
+        Returns:
+            Dict[str, Any]: Move counts, passes and cost saved on orders served before and after
+        """
+        tolerance = 1e-9
+        initial_cost = order_costs[assignments >= 0].sum()
+        initially_served = assignments >= 0
+        members = {}
+        for position in np.flatnonzero(initially_served):
+            members.setdefault(assignments[position], set()).add(position)
+
+        # Warehouses whose stock changed; later passes only revisit orders near them
+        touched = np.ones(len(stock), dtype=bool)
+
+        def move(position, w, lane):
+            current = assignments[position]
+            if current >= 0:
+                stock[current] += quantities[position]
+                members[current].discard(position)
+                touched[current] = True
+            touched[w] = True
+            stock[w] -= quantities[position]
+            members.setdefault(w, set()).add(position)
+            assignments[position] = w
+            order_costs[position] = lane_costs[position, lane]
+            order_distances[position] = lane_distances[position, lane]
+
+        relocations = swaps = placements = passes = 0
+        timed_out = False
+        valid_lanes = lane_warehouses >= 0
+        safe_lanes = np.where(valid_lanes, lane_warehouses, 0)
+        while not timed_out:
+            passes += 1
+            improved = False
+            # Only orders with a cheaper candidate lane (or unserved) can gain
+            active = np.flatnonzero(
+                (lane_costs.min(axis=1) < order_costs - tolerance)
+                & ((assignments >= 0) | (quantities <= stock.max(initial=0)))
+                & (touched[safe_lanes] & valid_lanes).any(axis=1)
+            )
+            touched[:] = False
+            for count, position in enumerate(active):
+                if count % 64 == 0 and time.time() >= deadline:
+                    timed_out = True
+                    break
+                quantity = quantities[position]
+                current = assignments[position]
+                lanes = safe_lanes[position]
+                with np.errstate(invalid='ignore'):
+                    # Unserved orders compare inf to inf on padded lanes
+                    gains = order_costs[position] - lane_costs[position]
+                fits = valid_lanes[position] & (stock[lanes] >= quantity) & (lanes != current)
+
+                candidates = np.flatnonzero(fits & (gains > tolerance))
+                if candidates.size:
+                    # The cheapest lane has the largest gain, also for unserved
+                    # orders whose gains are all inf
+                    lane = candidates[np.argmin(lane_costs[position, candidates])]
+                    move(position, lanes[lane], lane)
+                    if current >= 0:
+                        relocations += 1
+                    else:
+                        placements += 1
+                    improved = True
+                    continue
+                if current < 0:
+                    continue
+
+                # Swap with an order at a cheaper warehouse that has this order's
+                # warehouse among its own candidate lanes
+                best = None
+                for lane in np.flatnonzero(valid_lanes[position] & (gains > tolerance)):
+                    target = lanes[lane]
+                    if target == current or not members.get(target):
+                        continue
+                    partners = np.fromiter(members[target], dtype=np.int64)
+                    back = (lane_warehouses[partners] == current) & valid_lanes[partners]
+                    has_back = back.any(axis=1)
+                    partners, back = partners[has_back], back[has_back].argmax(axis=1)
+                    if partners.size == 0:
+                        continue
+                    partner_gains = order_costs[partners] - lane_costs[partners, back]
+                    partner_quantities = quantities[partners]
+                    feasible = (
+                        (stock[target] + partner_quantities >= quantity)
+                        & (stock[current] + quantity >= partner_quantities)
+                    )
+                    total = np.where(feasible, gains[lane] + partner_gains, -np.inf)
+                    pick = total.argmax()
+                    if total[pick] > tolerance and (best is None or total[pick] > best[0]):
+                        best = (total[pick], lane, partners[pick], back[pick])
+                if best is not None:
+                    _, lane, partner, back_lane = best
+                    target = lanes[lane]
+                    # Free the partner's stock first so both moves stay feasible
+                    stock[target] += quantities[partner]
+                    members[target].discard(partner)
+                    touched[target] = True
+                    assignments[partner] = -1
+                    move(position, target, lane)
+                    move(partner, current, back_lane)
+                    swaps += 1
+                    improved = True
+            if not improved or time.time() >= deadline:
+                break
+
+        still_served = initially_served & (assignments >= 0)
+        return {
+            'local_search_passes': passes,
+            'local_search_relocations': relocations,
+            'local_search_swaps': swaps,
+            'local_search_placements': placements,
+            'local_search_savings': float(initial_cost - order_costs[still_served].sum()),
+            'local_search_timed_out': timed_out
+        }
+
+    def _allocate_milp(self,
+                       warehouses: pd.DataFrame,
+                       orders: pd.DataFrame,
+                       distances: np.ndarray,
+                       costs: np.ndarray,
+                       results: Dict[str, Any],
+                       start_time: float,
+                       warm_start: Optional[np.ndarray] = None) -> Dict[str, Any]:
+        """
+        Assign orders by solving a sparse transportation MILP with PuLP/CBC.
+
+        Only a few candidate lanes per order enter the model. The LP relaxation is
+        solved first and its duals price the remaining lanes; lanes with negative
+        reduced cost are added until none are left or the time budget runs low.
+        Model build and solver I/O are not covered by CBC's time limit, so their
+        cost is estimated from the lane count and held back from every round:
+        generation stops while the final model still fits, and the final MILP
+        searches for what remains of solver_time, starting from a greedy plan
+        over the candidate lanes. When no time is left for a search, or the
+        search does not improve on it, that start is the result. Shipments may
+        not take a warehouse below MIN_UTILIZATION;
+        stock above MAX_UTILIZATION is penalized so it is drawn down first. Lanes
+        of a warm-start plan are seeded into the model and its incumbent.
+
+        Returns:
+            Dict[str, Any]: Solver metrics merged into performance_metrics
+        """
+        deadline = start_time + self.solver_time
+        quantities = orders['quantity'].to_numpy(dtype=float)
+        stock = warehouses['current_stock'].to_numpy(dtype=float)
+        capacity = warehouses['capacity'].to_numpy(dtype=float)
+
+        allowance = np.maximum(stock - self.min_utilization * capacity, 0)
+        excess = np.maximum(stock - self.max_utilization * capacity, 0)
+
+        # Lanes that can never be used are priced out of the model entirely
+        lane_costs = np.where(quantities[:, np.newaxis] <= allowance, costs, np.inf)
+        finite_costs = lane_costs[np.isfinite(lane_costs)]
+        assignments = np.full(len(orders), -1)
+        if finite_costs.size == 0:
+            self._record_assignments(warehouses, orders, assignments, distances, costs, results,
+                                     'No warehouse can cover the order within utilization bounds')
+            return {'solver_status': 'No feasible lanes', 'optimality_gap': 0.0}
+
+        # Leaving an order unserved must always cost more than serving it
+        unfulfilled_penalty = 10 * finite_costs.max() + 1
+        excess_penalty = unfulfilled_penalty / max(quantities.mean(), 1)
+        model_data = {
+            'quantities': quantities,
+            'allowance': allowance,
+            'excess': excess,
+            'unfulfilled_penalty': unfulfilled_penalty,
+            'excess_penalty': excess_penalty
+        }
+
+        lanes = self._cheapest_lanes(lane_costs, self.milp_candidates)
+        if warm_start is not None:
+            warm_orders = np.flatnonzero(warm_start >= 0)
+            warm_lanes = warm_orders * costs.shape[1] + warm_start[warm_orders]
+            lanes = np.union1d(lanes, warm_lanes[np.isfinite(lane_costs.flat[warm_lanes])])
+        lp_bound = None
+        converged = False
+        # Lane generation may use half of the budget, the MILP gets the rest.
+        # Each round must also leave room to build and solve the final model,
+        # which is at least as large as the current one.
+        generation_deadline = time.time() + (deadline - time.time()) / 2
+        while True:
+            overhead = self._milp_lane_seconds * lanes.size
+            time_limit = min(generation_deadline, deadline - overhead) - time.time() - overhead
+            if time_limit <= 0:
+                break
+            round_start = time.time()
+            relaxation = self._solve_assignment_model(
+                lanes, lane_costs, model_data, relax=True, time_limit=time_limit
+            )
+            # The whole round, LP solve included, is a cautious per-lane estimate
+            self._milp_lane_seconds = (time.time() - round_start) / lanes.size
+            if relaxation is None:
+                break
+
+            # Price every lane against the relaxation duals
+            reduced_costs = (
+                lane_costs - unfulfilled_penalty
+                - relaxation['order_duals'][:, np.newaxis]
+                - quantities[:, np.newaxis] * relaxation['warehouse_duals']
+            )
+            # Each order takes at most one lane, so its most negative reduced cost
+            # bounds how far the full model can undercut the restricted relaxation
+            lp_bound = relaxation['objective'] + np.minimum(reduced_costs.min(axis=1), 0).sum()
+            reduced_costs.flat[lanes] = np.inf
+            reduced_costs[reduced_costs >= -1e-6] = np.inf
+            new_lanes = self._cheapest_lanes(reduced_costs, self.milp_candidates)
+            if new_lanes.size == 0:
+                converged = True
+                break
+            lanes = np.union1d(lanes, new_lanes)
+
+        start = self._greedy_lane_start(lanes, lane_costs, quantities, allowance, warm_start)
+        start_objective = self._lane_objective(lanes, lane_costs, model_data, start)
+        solution = None
+        time_limit = (deadline - time.time() - self._milp_lane_seconds * lanes.size
+                      - MILP_TIME_MARGIN * self.solver_time)
+        if time_limit >= MILP_MIN_SEARCH_TIME:
+            solve_start = time.time()
+            solution = self._solve_assignment_model(
+                lanes, lane_costs, model_data, relax=False,
+                time_limit=time_limit, initial_values=start
+            )
+            # Time beyond the limit is overhead the next estimate must cover
+            overrun = (time.time() - solve_start - time_limit) / lanes.size
+            self._milp_lane_seconds = max(self._milp_lane_seconds, overrun)
+        if solution is None:
+            self.logger.warning("No MILP solution within solver_time, keeping the greedy start")
+            solution = {'status': 'Not Solved', 'objective': start_objective, 'values': start}
+        elif solution['objective'] > start_objective:
+            solution = {'status': 'Feasible', 'objective': start_objective, 'values': start}
+
+        chosen = lanes[solution['values'] > 0.5]
+        assignments[chosen // costs.shape[1]] = chosen % costs.shape[1]
+        self._record_assignments(warehouses, orders, assignments, distances, costs, results,
+                                 'No warehouse can cover the order within utilization bounds')
+
+        gap = None
+        if lp_bound is not None:
+            gap = float(max(solution['objective'] - lp_bound, 0) / max(abs(solution['objective']), 1e-9) * 100)
+        if solution['status'] != 'Optimal':
+            results['status'] = 'Time Limit Reached'
+        return {
+            'solver_status': solution['status'],
+            'optimality_gap': gap,
+            'candidate_lanes': int(lanes.size),
+            'lane_generation_converged': converged
+        }
+
+    def _allocate_split(self,
+                        warehouses: pd.DataFrame,
+                        orders: pd.DataFrame,
+                        distances: np.ndarray,
+                        costs: np.ndarray,
+                        results: Dict[str, Any],
+                        deadline: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Allocate orders as a transportation LP from warehouses to orders, allowing splits.
+
+        Each lane carries a per-unit cost chosen so that shipping a whole order
+        costs the same as in the single-warehouse modes. Orders whose cheapest
+        warehouse has stock for everyone who prefers it are fixed there; only
+        orders competing for over-subscribed warehouses go into the LP, which
+        starts from their cheapest few lanes. After each solve the duals price
+        every lane: negatively priced lanes are added, and fixed orders that
+        could be moved (or left unserved) more cheaply are released into the
+        model. The loop ends when nothing is priced out, so the plan is optimal
+        for the full network; the constraint matrix is totally unimodular, so
+        the simplex vertex ships whole units.
+
+        The LP is solved by HiGHS through scipy's linprog, a general LP solver
+        rather than a network simplex. Every solve is limited to what is left
+        until the deadline, less an allowance per model order for the work
+        around it, and no round starts that would likely end after it.
+        When time runs out the plan of the last finished solve is kept, or the
+        competing orders are placed greedily if none finished; the plan is then
+        feasible but not proven optimal.
+
+        Returns:
+            Dict[str, Any]: Solver metrics merged into performance_metrics
+        """
+        n_warehouses = costs.shape[1]
+        quantities = orders['quantity'].to_numpy(dtype=float)
+        stock = np.maximum(warehouses['current_stock'].to_numpy(dtype=float), 0)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            unit_costs = costs / quantities[:, np.newaxis]
+        unit_costs[~np.isfinite(unit_costs)] = np.inf
+        finite_costs = unit_costs[np.isfinite(unit_costs)]
+        if finite_costs.size == 0:
+            self._record_assignments(warehouses, orders, np.full(len(orders), -1), distances, costs,
+                                     results, 'Insufficient stock across all warehouses')
+            return {'solver_status': 'No feasible lanes', 'split_orders': 0}
+
+        # Unserved units must always cost more than any lane
+        unserved_penalty = 10 * finite_costs.max() + 1
+
+        cheapest = np.argmin(unit_costs, axis=1)
+        has_lane = np.isfinite(unit_costs[np.arange(len(orders)), cheapest])
+        preferred_demand = np.bincount(
+            cheapest[has_lane], weights=quantities[has_lane], minlength=n_warehouses
+        )
+        in_model = has_lane & (preferred_demand > stock)[cheapest]
+        lanes = self._cheapest_lanes(
+            np.where(in_model[:, np.newaxis], unit_costs, np.inf), self.split_candidates
+        )
+        rounds = 0
+        converged = False
+        # Fixed orders, lane orders, lane warehouses and units shipped of the last finished solve
+        plan = None
+
+        while True:
+            round_start = time.time()
+            time_limit = None
+            if deadline is not None:
+                time_limit = deadline - round_start - SPLIT_SECONDS_PER_ORDER * in_model.sum()
+                if time_limit <= 0:
+                    break
+            fixed = np.flatnonzero(has_lane & ~in_model)
+            residual_stock = stock - np.bincount(
+                cheapest[fixed], weights=quantities[fixed], minlength=n_warehouses
+            )
+            model_positions = np.flatnonzero(in_model)
+            lane_orders, lane_warehouses = np.divmod(lanes, n_warehouses)
+            flow = self._solve_transport_lp(
+                np.searchsorted(model_positions, lane_orders) * n_warehouses + lane_warehouses,
+                unit_costs[model_positions], quantities[model_positions],
+                residual_stock, unserved_penalty, time_limit
+            )
+            if flow is None:
+                break
+            rounds += 1
+            plan = (fixed, lane_orders, lane_warehouses, np.rint(flow['values']).astype(np.int64))
+
+            # Lanes of model orders that undercut their order's current price;
+            # orders outside the model have no dual (inf - inf on their unusable lanes)
+            order_duals = np.full(len(orders), np.inf)
+            order_duals[model_positions] = flow['order_duals']
+            with np.errstate(invalid='ignore'):
+                reduced_costs = unit_costs - order_duals[:, np.newaxis] - flow['warehouse_duals']
+            reduced_costs.flat[lanes] = np.inf
+            reduced_costs[~(reduced_costs < -1e-9)] = np.inf
+            new_lanes = self._cheapest_lanes(reduced_costs, self.split_candidates)
+
+            # A fixed order stays fixed only if neither another lane nor leaving
+            # it unserved undercuts its current lane at the model duals
+            priced = unit_costs[fixed] - flow['warehouse_duals']
+            current = priced[np.arange(fixed.size), cheapest[fixed]]
+            best_alternative = np.minimum(priced.min(axis=1), unserved_penalty)
+            released = fixed[best_alternative < current - 1e-9]
+
+            if new_lanes.size == 0 and released.size == 0:
+                converged = True
+                break
+            # The next, larger model takes at least as long as this one
+            if deadline is not None and time.time() + (time.time() - round_start) > deadline:
+                break
+            in_model[released] = True
+            released_lanes = self._cheapest_lanes(unit_costs[released], self.split_candidates)
+            released_orders, released_warehouses = np.divmod(released_lanes, n_warehouses)
+            lanes = np.union1d(
+                np.union1d(lanes, new_lanes),
+                released[released_orders] * n_warehouses + released_warehouses
+            )
+
+        solver_status = 'Optimal' if converged else 'Feasible'
+        if plan is None:
+            # No solve finished in time: competing orders take their cheapest
+            # warehouse with stock left, whole orders only
+            self.logger.warning("No split LP solution within solver_time, placing orders greedily")
+            solver_status = 'Not Solved'
+            fixed = np.flatnonzero(has_lane & ~in_model)
+            model_positions = np.flatnonzero(in_model)
+            residual_stock = stock - np.bincount(
+                cheapest[fixed], weights=quantities[fixed], minlength=n_warehouses
+            )
+            assignments = self.greedy_assign(
+                costs[model_positions], quantities[model_positions], residual_stock
+            )
+            placed = np.flatnonzero(assignments >= 0)
+            plan = (fixed, model_positions[placed], assignments[placed],
+                    orders['quantity'].to_numpy()[model_positions[placed]].astype(np.int64))
+
+        fixed, lane_orders, lane_warehouses, shipped = plan
+        used = shipped > 0
+        flow_orders = np.concatenate([fixed, lane_orders[used]])
+        flow_warehouses = np.concatenate([cheapest[fixed], lane_warehouses[used]])
+        flow_quantities = np.concatenate([
+            orders['quantity'].to_numpy()[fixed].astype(np.int64), shipped[used]
+        ])
+        self._record_flows(
+            warehouses, orders, flow_orders, flow_warehouses, flow_quantities,
+            unit_costs[flow_orders, flow_warehouses] * flow_quantities,
+            distances[flow_orders, flow_warehouses], results,
+            'Insufficient stock across all warehouses'
+        )
+
+        self._record_split_orders(warehouses, orders, flow_orders, flow_warehouses,
+                                  flow_quantities, results)
+        if not converged or (deadline is not None and time.time() > deadline):
+            results['status'] = 'Time Limit Reached'
+        return {
+            'solver_status': solver_status,
+            'orders_in_lp_model': int(in_model.sum()),
+            'candidate_lanes': int(lanes.size),
+            'pricing_rounds': rounds,
+            'pricing_converged': converged,
+            'split_orders': len(results['split_orders'])
+        }
+
+    @staticmethod
+    def _solve_transport_lp(lanes: np.ndarray,
+                            unit_costs: np.ndarray,
+                            quantities: np.ndarray,
+                            stock: np.ndarray,
+                            unserved_penalty: float,
+                            time_limit: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Solve the transportation LP restricted to the given lanes with HiGHS.
+
+        Returns:
+            Optional[Dict[str, Any]]: Lane flows and duals, None when time_limit
+                (seconds) ran out before the solve finished
+        """
+        n_orders, n_warehouses = unit_costs.shape
+        lane_orders, lane_warehouses = np.divmod(lanes, n_warehouses)
+        n_lanes = lanes.size
+        if n_orders == 0:
+            return {'values': np.empty(0), 'order_duals': np.empty(0),
+                    'warehouse_duals': np.zeros(n_warehouses)}
+
+        # Columns: one per lane, then one unserved-demand column per order
+        demand_rows = sparse.csr_matrix(
+            (np.ones(n_lanes + n_orders),
+             (np.concatenate([lane_orders, np.arange(n_orders)]),
+              np.arange(n_lanes + n_orders))),
+            shape=(n_orders, n_lanes + n_orders)
+        )
+        supply_rows = sparse.csr_matrix(
+            (np.ones(n_lanes), (lane_warehouses, np.arange(n_lanes))),
+            shape=(n_warehouses, n_lanes + n_orders)
+        )
+        result = linprog(
+            np.concatenate([unit_costs.flat[lanes], np.full(n_orders, unserved_penalty)]),
+            A_ub=supply_rows, b_ub=stock,
+            A_eq=demand_rows, b_eq=quantities,
+            bounds=(0, None),
+            # Dual simplex stalls on large supply-constrained models where
+            # interior point (with crossover to a vertex) stays fast
+            method='highs-ds' if n_lanes < SPLIT_SIMPLEX_MAX_LANES else 'highs-ipm',
+            options={} if time_limit is None else {'time_limit': time_limit}
+        )
+        if result.status == 1:
+            return None
+        if result.status != 0:
+            raise ValueError(f"Split LP could not be solved: {result.message}")
+
+        return {
+            'lanes': lanes,
+            'values': result.x[:n_lanes],
+            'order_duals': result.eqlin.marginals,
+            'warehouse_duals': result.ineqlin.marginals
+        }
+
+    @staticmethod
+    def _cheapest_lanes(lane_costs: np.ndarray, k: int) -> np.ndarray:
+        """Flat indices of the k cheapest finite lanes of every order"""
+        k = min(k, lane_costs.shape[1])
+        if k == 0:
+            return np.empty(0, dtype=np.int64)
+        candidates = np.argpartition(lane_costs, k - 1, axis=1)[:, :k]
+        finite = np.isfinite(np.take_along_axis(lane_costs, candidates, axis=1))
+        rows = np.broadcast_to(np.arange(lane_costs.shape[0])[:, np.newaxis], candidates.shape)
+        return np.sort(rows[finite].astype(np.int64) * lane_costs.shape[1] + candidates[finite])
+
+    @staticmethod
+    def _lane_objective(lanes: np.ndarray,
+                        lane_costs: np.ndarray,
+                        model_data: Dict[str, Any],
+                        selected: np.ndarray) -> float:
+        """Objective of the assignment model for a 0/1 lane selection"""
+        lane_orders, lane_warehouses = np.divmod(lanes, lane_costs.shape[1])
+        chosen = selected > 0.5
+        shipped = np.bincount(
+            lane_warehouses[chosen], weights=model_data['quantities'][lane_orders[chosen]],
+            minlength=lane_costs.shape[1]
+        )
+        return float(
+            lane_costs.flat[lanes[chosen]].sum()
+            + model_data['unfulfilled_penalty'] * (lane_costs.shape[0] - chosen.sum())
+            + model_data['excess_penalty'] * np.maximum(model_data['excess'] - shipped, 0).sum()
+        )
+
+    @staticmethod
+    def _greedy_lane_start(lanes: np.ndarray,
+                           lane_costs: np.ndarray,
+                           quantities: np.ndarray,
+                           allowance: np.ndarray,
+                           preferred: Optional[np.ndarray] = None) -> np.ndarray:
+        """Feasible 0/1 lane selection used as the MILP incumbent"""
+        lane_orders, lane_warehouses = np.divmod(lanes, lane_costs.shape[1])
+        lane_order_costs = lane_costs.flat[lanes]
+        available = allowance.copy()
+        selected = np.zeros(lanes.size)
+        starts = np.searchsorted(lane_orders, np.arange(lane_costs.shape[0] + 1))
+        for order in range(lane_costs.shape[0]):
+            positions = np.arange(starts[order], starts[order + 1])
+            positions = positions[available[lane_warehouses[positions]] >= quantities[order]]
+            if positions.size:
+                best = positions[np.argmin(lane_order_costs[positions])]
+                if preferred is not None:
+                    # Stay on the warm-start lane when it is still available
+                    kept = positions[lane_warehouses[positions] == preferred[order]]
+                    best = kept[0] if kept.size else best
+                selected[best] = 1
+                available[lane_warehouses[best]] -= quantities[order]
+        return selected
+
+    def _solve_assignment_model(self,
+                                lanes: np.ndarray,
+                                lane_costs: np.ndarray,
+                                model_data: Dict[str, Any],
+                                relax: bool,
+                                time_limit: float,
+                                initial_values: Optional[np.ndarray] = None) -> Optional[Dict[str, Any]]:
+        """Build and solve the assignment model restricted to the given lanes"""
+        n_orders, n_warehouses = lane_costs.shape
+        lane_orders, lane_warehouses = np.divmod(lanes, n_warehouses)
+        quantities = model_data['quantities']
+        excess = model_data['excess']
+
+        problem = pulp.LpProblem('inventory_allocation', pulp.LpMinimize)
+        # The relaxation leaves x <= 1 implied by the order rows so that
+        # their duals carry the full reduced cost used for lane pricing
+        category = pulp.LpContinuous if relax else pulp.LpBinary
+        assign = [
+            pulp.LpVariable(f'x_{lane}', lowBound=0, upBound=None if relax else 1, cat=category)
+            for lane in lanes
+        ]
+        over_stock = {
+            w: pulp.LpVariable(f'excess_{w}', lowBound=0)
+            for w in np.flatnonzero(excess > 0)
+        }
+
+        # Unserved orders pay the penalty, so serving one earns it back
+        penalty = model_data['unfulfilled_penalty']
+        problem += pulp.LpAffineExpression(
+            list(zip(assign, lane_costs.flat[lanes] - penalty))
+            + [(var, model_data['excess_penalty']) for var in over_stock.values()],
+            constant=penalty * n_orders
+        )
+
+        by_order = np.split(np.arange(lanes.size), np.flatnonzero(np.diff(lane_orders)) + 1)
+        for positions in by_order:
+            if positions.size:
+                problem += (
+                    pulp.LpAffineExpression([(assign[p], 1) for p in positions]) <= 1,
+                    f'order_{lane_orders[positions[0]]}'
+                )
+
+        warehouse_order = np.argsort(lane_warehouses, kind='stable')
+        by_warehouse = np.split(
+            warehouse_order,
+            np.flatnonzero(np.diff(lane_warehouses[warehouse_order])) + 1
+        )
+        for positions in by_warehouse:
+            if not positions.size:
+                continue
+            w = lane_warehouses[positions[0]]
+            shipped = pulp.LpAffineExpression(
+                [(assign[p], quantities[lane_orders[p]]) for p in positions]
+            )
+            problem += shipped <= model_data['allowance'][w], f'stock_{w}'
+            if w in over_stock:
+                problem += shipped + over_stock[w] >= excess[w], f'max_util_{w}'
+
+        if initial_values is not None:
+            for var, value in zip(assign, initial_values):
+                var.setInitialValue(value)
+        solver = pulp.PULP_CBC_CMD(
+            msg=False,
+            timeLimit=max(time_limit, 0.1),
+            warmStart=initial_values is not None
+        )
+        problem.solve(solver)
+        if problem.sol_status not in (pulp.LpSolutionOptimal, pulp.LpSolutionIntegerFeasible):
+            return None
+
+        solution = {
+            'status': 'Optimal' if problem.sol_status == pulp.LpSolutionOptimal else 'Feasible',
+            'objective': pulp.value(problem.objective),
+            'values': np.array([var.varValue or 0 for var in assign])
+        }
+        if relax:
+            order_duals = np.zeros(n_orders)
+            warehouse_duals = np.zeros(n_warehouses)
+            for name, constraint in problem.constraints.items():
+                kind, index = name.rsplit('_', 1)
+                dual = constraint.pi or 0
+                if kind == 'order':
+                    order_duals[int(index)] = dual
+                else:
+                    warehouse_duals[int(index)] += dual
+            # Orders outside the model carry no dual; penalty-shifted costs price them
+            solution['order_duals'] = order_duals
+            solution['warehouse_duals'] = warehouse_duals
+        return solution
+
+    def _record_assignments(self,
+                            warehouses: pd.DataFrame,
+                            orders: pd.DataFrame,
+                            assignments: np.ndarray,
+                            distances: np.ndarray,
+                            costs: np.ndarray,
+                            results: Dict[str, Any],
+                            unfulfilled_reason: str) -> None:
+        """Write per-order warehouse assignments (-1 = unserved) into results"""
+        positions = np.flatnonzero(assignments >= 0)
+        chosen = assignments[positions]
+        self._record_flows(
+            warehouses, orders, positions, chosen,
+            orders['quantity'].to_numpy()[positions], costs[positions, chosen],
+            distances[positions, chosen], results, unfulfilled_reason
+        )
+
+    @staticmethod
+    def _record_split_orders(warehouses: pd.DataFrame,
+                             orders: pd.DataFrame,
+                             flow_orders: np.ndarray,
+                             flow_warehouses: np.ndarray,
+                             flow_quantities: np.ndarray,
+                             results: Dict[str, Any]) -> None:
+        """List the sources of every order served by more than one warehouse"""
+        sources = np.bincount(flow_orders, minlength=len(orders))
+        order_ids = orders['order_id'].to_numpy()
+        warehouse_ids = warehouses['warehouse_id'].to_numpy()
+        results['split_orders'] = {}
+        for position, w, quantity in zip(flow_orders, flow_warehouses, flow_quantities):
+            if sources[position] > 1:
+                results['split_orders'].setdefault(order_ids[position], []).append({
+                    'warehouse_id': warehouse_ids[w],
+                    'quantity': int(quantity)
+                })
+
+    def _record_flows(self,
+                      warehouses: pd.DataFrame,
+                      orders: pd.DataFrame,
+                      flow_orders: np.ndarray,
+                      flow_warehouses: np.ndarray,
+                      flow_quantities: np.ndarray,
+                      flow_costs: np.ndarray,
+                      flow_distances: np.ndarray,
+                      results: Dict[str, Any],
+                      unfulfilled_reason: str) -> None:
+        """
+        Write shipments (order position, warehouse index, quantity, cost, distance)
+        into results as a columnar allocations table, one row per shipment in
+        order processing order, with allocation_plan as a dict view over it.
+        """
+        warehouse_ids = warehouses['warehouse_id'].to_numpy()
+        order_ids = orders['order_id'].to_numpy()
+        quantities = orders['quantity'].to_numpy()
+
+        flow_orders = np.asarray(flow_orders, dtype=np.int64)
+        flow_warehouses = np.asarray(flow_warehouses, dtype=np.int64)
+        flow_quantities = np.asarray(flow_quantities)
+        ordering = np.argsort(flow_orders, kind='stable')
+        allocations = pd.DataFrame({
+            'order_id': order_ids[flow_orders[ordering]],
+            'warehouse_id': warehouse_ids[flow_warehouses[ordering]],
+            'quantity': flow_quantities[ordering],
+            'cost': np.asarray(flow_costs, dtype=float)[ordering],
+            'distance': np.asarray(flow_distances, dtype=float)[ordering]
+        }, columns=ALLOCATION_COLUMNS)
+        results['allocations'] = allocations
+        results['allocation_plan'] = AllocationPlanView(allocations)
+        results['total_cost'] += float(allocations['cost'].sum())
+
+        served = np.bincount(flow_orders, weights=flow_quantities, minlength=len(orders))
+        for position in np.flatnonzero(served < quantities):
+            reason = unfulfilled_reason
+            if served[position] > 0:
+                reason = f"Partially fulfilled: {unfulfilled_reason}"
+            results['unfulfilled_orders'].append({
+                'order_id': order_ids[position],
+                'quantity': quantities[position] - served[position].astype(quantities.dtype),
+                'reason': reason
+            })
+
+        shipped = np.bincount(
+            flow_warehouses, weights=flow_quantities, minlength=len(warehouses)
+        ).astype(np.asarray(flow_quantities).dtype)
+        for w in np.flatnonzero(shipped):
+            warehouse_row = warehouses.iloc[w]
+            remaining = warehouse_row['current_stock'] - shipped[w]
+            results['warehouse_utilization'][warehouse_ids[w]] = {
+                'warehouse_name': warehouse_row['name'],
+                'initial_stock': warehouse_row['current_stock'],
+                'used_capacity': shipped[w],
+                'remaining_stock': remaining,
+                'total_capacity': warehouse_row['capacity'],
+                'utilization_percentage': remaining / warehouse_row['capacity'] * 100
+            }
+
+    def get_optimization_summary(self, results: Dict[str, Any]) -> Dict[str, Any]:
+        """Generate a summary of optimization results"""
+        try:
+            return {
+                'total_cost': round(results['total_cost'], 2),
+                'total_orders': results['performance_metrics']['total_orders'],
+                'fulfilled_orders': results['performance_metrics']['fulfilled_orders'],
+                'fulfillment_rate': round(results['performance_metrics']['fulfillment_rate'], 1),
+                'average_cost_per_order': round(results['performance_metrics']['average_cost_per_order'], 2),
+                'solving_time': round(results['solving_time'], 2),
+                'status': results['status'],
+                'timestamp': results['optimization_timestamp']
+            }
+        except Exception as e:
+            self.logger.error(f"Error generating optimization summary: {str(e)}")
+            return {}
+
+
+def _optimize_region(settings: Dict[str, Any],
+                     warehouses: pd.DataFrame,
+                     orders: pd.DataFrame,
+                     lane_rates: Optional[np.ndarray],
+                     mode: str,
+                     deadline: float) -> Dict[str, Any]:
+    """Process pool entry point: optimize one regional subproblem"""
+    optimizer = InventoryOptimizer()
+    optimizer.__dict__.update(settings)
+    return optimizer.optimize(warehouses, orders, lane_rates, mode, deadline=deadline, use_warm_start=False)
+
+
+def _optimize_snapshot_region(settings: Dict[str, Any],
+                              path: str,
+                              warehouses: pd.DataFrame,
+                              order_rows: np.ndarray,
+                              lane_rates: Optional[np.ndarray],
+                              mode: str,
+                              deadline: float) -> Dict[str, Any]:
+    """Process pool entry point: optimize one region read from a shared snapshot"""
+    return _optimize_region(settings, warehouses, OptimizerSnapshot(path).orders(order_rows),
+                            lane_rates, mode, deadline)
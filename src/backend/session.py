@@ -0,0 +1,236 @@
+import logging
+import time
+from typing import Dict, Any, Iterable, List, Optional
+import pandas as pd
+import numpy as np
+from src.backend.optimizer import InventoryOptimizer
+
+ORDER_COLUMNS = ['order_id', 'quantity', 'status', 'delivery_latitude', 'delivery_longitude']
+
+
+class OptimizationSession:
+    """
+    Keeps an allocation plan and the remaining stock between optimizer runs.
+
+    Order and stock deltas only re-plan the orders they touch: new and modified
+    orders are placed greedily against the remaining stock, cancellations and
+    stock increases give unfulfilled orders another chance, and stock cuts
+    evict just enough allocations from the affected warehouse to stay covered.
+    A repaired plan can differ from a fresh greedy run over all orders; call
+    reoptimize() to rebuild it from scratch.
+    """
+
+    def __init__(self,
+                 warehouses: pd.DataFrame,
+                 orders: pd.DataFrame,
+                 optimizer: Optional[InventoryOptimizer] = None):
+        """
+        Initialize the session and solve the initial plan.
+
+        Args:
+            warehouses (pd.DataFrame): Warehouses with stock, capacity and coordinates
+            orders (pd.DataFrame): Pending orders to allocate
+            optimizer (Optional[InventoryOptimizer]): Optimizer used for pricing lanes
+        """
+        self.optimizer = optimizer or InventoryOptimizer()
+        self.logger = logging.getLogger(__name__)
+
+        self.warehouses = warehouses.reset_index(drop=True)
+        self._warehouse_positions = {
+            warehouse_id: position
+            for position, warehouse_id in enumerate(self.warehouses['warehouse_id'])
+        }
+        self.stock = self.warehouses['current_stock'].to_numpy(dtype=float, copy=True)
+        self.remaining_stock = self.stock.copy()
+
+        self._orders: Dict[Any, Dict[str, Any]] = {}
+        self._allocations: Dict[Any, tuple] = {}  # order_id -> (warehouse position, cost, distance)
+        self._by_warehouse: Dict[int, set] = {}
+        self._unfulfilled: set = set()
+        self.last_update_time = 0.0
+
+        self._store_orders(orders)
+        self.reoptimize()
+
+    def reoptimize(self) -> Dict[str, Any]:
+        """Discard the current plan and allocate every order again"""
+        start_time = time.time()
+        self._allocations.clear()
+        self._by_warehouse.clear()
+        self._unfulfilled.clear()
+        self.remaining_stock = self.stock.copy()
+        changes = self._place(list(self._orders))
+        self.last_update_time = time.time() - start_time
+        return changes
+
+    def add_orders(self, orders: pd.DataFrame) -> Dict[str, Any]:
+        """Allocate new orders; known order IDs are treated as modifications"""
+        start_time = time.time()
+        known = orders['order_id'].isin(self._orders)
+        changes = {'allocated': {}, 'unfulfilled': []}
+        if known.any():
+            changes = self.modify_orders(orders[known])
+        new_orders = orders[~known]
+        self._store_orders(new_orders)
+        self._merge_changes(changes, self._place(new_orders['order_id'].tolist()))
+        self.last_update_time = time.time() - start_time
+        return changes
+
+    def cancel_orders(self, order_ids: Iterable) -> Dict[str, Any]:
+        """Drop orders from the plan and offer their stock to unfulfilled orders"""
+        start_time = time.time()
+        for order_id in order_ids:
+            if order_id in self._orders:
+                self._release(order_id)
+                del self._orders[order_id]
+        changes = self._retry_unfulfilled()
+        self.last_update_time = time.time() - start_time
+        return changes
+
+    def modify_orders(self, orders: pd.DataFrame) -> Dict[str, Any]:
+        """Re-plan orders whose quantity, priority or destination changed"""
+        start_time = time.time()
+        order_ids = [order_id for order_id in orders['order_id'] if order_id in self._orders]
+        for order_id in order_ids:
+            self._release(order_id)
+        self._store_orders(orders[orders['order_id'].isin(order_ids)])
+        changes = self._place(order_ids)
+        self._merge_retried(changes)
+        self.last_update_time = time.time() - start_time
+        return changes
+
+    def adjust_stock(self, stock_changes: Dict[Any, float]) -> Dict[str, Any]:
+        """
+        Apply stock deltas per warehouse.
+
+        Args:
+            stock_changes (Dict[Any, float]): warehouse_id -> change in current stock
+
+        Returns:
+            Dict[str, Any]: Orders that were (re)allocated, left unfulfilled or evicted
+        """
+        unknown = [warehouse_id for warehouse_id in stock_changes
+                   if warehouse_id not in self._warehouse_positions]
+        if unknown:
+            raise ValueError(f"Unknown warehouse IDs: {unknown}")
+
+        start_time = time.time()
+        evicted = []
+        for warehouse_id, delta in stock_changes.items():
+            position = self._warehouse_positions[warehouse_id]
+            self.stock[position] += delta
+            self.remaining_stock[position] += delta
+            if self.remaining_stock[position] < 0:
+                evicted.extend(self._evict(position))
+
+        changes = self._place(evicted)
+        changes['evicted'] = evicted
+        if any(delta > 0 for delta in stock_changes.values()):
+            self._merge_retried(changes)
+        self.last_update_time = time.time() - start_time
+        return changes
+
+    def results(self) -> Dict[str, Any]:
+        """Current plan in the format returned by InventoryOptimizer.optimize"""
+        orders = self._order_frame(list(self._orders))
+        warehouses = self.warehouses.assign(current_stock=self.stock)
+
+        order_ids = orders['order_id'].to_numpy()
+        served = np.flatnonzero([order_id in self._allocations for order_id in order_ids])
+        lanes = [self._allocations[order_id] for order_id in order_ids[served]]
+        return self.optimizer.results_from_flows(
+            warehouses, orders, served,
+            np.array([lane[0] for lane in lanes], dtype=np.int64),
+            orders['quantity'].to_numpy()[served],
+            np.array([lane[1] for lane in lanes]),
+            np.array([lane[2] for lane in lanes]),
+            self.last_update_time
+        )
+
+    @staticmethod
+    def _merge_changes(changes: Dict[str, Any], later: Dict[str, Any]) -> None:
+        """Fold the changes of a later step into changes; the later step wins per order"""
+        allocated = {
+            order_id: warehouse_id for order_id, warehouse_id in changes['allocated'].items()
+            if order_id not in later['unfulfilled']
+        }
+        allocated.update(later['allocated'])
+        unfulfilled = [order_id for order_id in changes['unfulfilled'] if order_id not in allocated]
+        unfulfilled += [
+            order_id for order_id in later['unfulfilled']
+            if order_id not in allocated and order_id not in unfulfilled
+        ]
+        changes['allocated'] = allocated
+        changes['unfulfilled'] = unfulfilled
+
+    def _merge_retried(self, changes: Dict[str, Any]) -> None:
+        """Retry unfulfilled orders and fold the ones now allocated into changes"""
+        retried = self._retry_unfulfilled()
+        # Orders the retry could not place were unfulfilled before this step
+        self._merge_changes(changes, {'allocated': retried['allocated'], 'unfulfilled': []})
+
+    def _store_orders(self, orders: pd.DataFrame) -> None:
+        """Keep the optimizer-relevant fields of each order"""
+        for record in orders[ORDER_COLUMNS].to_dict('records'):
+            self._orders[record['order_id']] = record
+
+    def _order_frame(self, order_ids: List) -> pd.DataFrame:
+        """Orders as a frame in optimizer processing order (priority, then size)"""
+        frame = pd.DataFrame([self._orders[order_id] for order_id in order_ids], columns=ORDER_COLUMNS)
+        return frame.sort_values(by=['status', 'quantity'], ascending=[True, False])
+
+    def _place(self, order_ids: List) -> Dict[str, Any]:
+        """Greedily allocate the given orders against the remaining stock"""
+        changes = {'allocated': {}, 'unfulfilled': []}
+        if not order_ids:
+            return changes
+
+        batch = self._order_frame(order_ids)
+        distances, costs = self.optimizer.build_cost_matrix(self.warehouses, batch)
+        assignments = InventoryOptimizer.greedy_assign(
+            costs, batch['quantity'].to_numpy(), self.remaining_stock
+        )
+
+        warehouse_ids = self.warehouses['warehouse_id'].to_numpy()
+        for position, order_id in enumerate(batch['order_id']):
+            w = assignments[position]
+            if w < 0:
+                self._unfulfilled.add(order_id)
+                changes['unfulfilled'].append(order_id)
+                continue
+            self._unfulfilled.discard(order_id)
+            self._allocations[order_id] = (w, costs[position, w], distances[position, w])
+            self._by_warehouse.setdefault(w, set()).add(order_id)
+            changes['allocated'][order_id] = warehouse_ids[w]
+        return changes
+
+    def _release(self, order_id) -> None:
+        """Return an order's stock to its warehouse and forget its allocation"""
+        self._unfulfilled.discard(order_id)
+        allocation = self._allocations.pop(order_id, None)
+        if allocation is not None:
+            self.remaining_stock[allocation[0]] += self._orders[order_id]['quantity']
+            self._by_warehouse[allocation[0]].discard(order_id)
+
+    def _evict(self, position: int) -> List:
+        """Release lowest-priority allocations of a warehouse until its stock is covered"""
+        allocated = self._order_frame(list(self._by_warehouse.get(position, ())))
+        evicted = []
+        for order_id in reversed(allocated['order_id'].tolist()):
+            if self.remaining_stock[position] >= 0:
+                break
+            self._release(order_id)
+            evicted.append(order_id)
+        if self.remaining_stock[position] < 0:
+            self.logger.warning(f"Warehouse {self.warehouses['warehouse_id'].iloc[position]} "
+                                f"has negative stock after evicting all allocations")
+        return evicted
+
+    def _retry_unfulfilled(self) -> Dict[str, Any]:
+        """Offer freed stock to unfulfilled orders that could now fit"""
+        largest = self.remaining_stock.max() if self.remaining_stock.size else 0
+        candidates = [
+            order_id for order_id in self._unfulfilled
+            if self._orders[order_id]['quantity'] <= largest
+        ]
+        return self._place(candidates)
@@ -0,0 +1,206 @@
+import logging
+import os
+import shutil
+from typing import Dict, Any, List, Optional
+import pandas as pd
+import numpy as np
+from src.backend.allocation_plan import AllocationPlanView
+
+# Numeric optimizer inputs stored as structured-array fields, in their own dtype
+WAREHOUSE_FIELDS = ['latitude', 'longitude', 'current_stock', 'capacity', 'storage_cost']
+ORDER_FIELDS = ['quantity', 'delivery_latitude', 'delivery_longitude']
+ORDER_TIME_FIELDS = ['date', 'delivery_deadline']  # Stored when present
+
+# Text columns stored as integer codes into a sorted label array
+WAREHOUSE_LABELS = ['warehouse_id', 'name']
+ORDER_LABELS = ['product_id', 'region', 'status']
+
+
+class OptimizerSnapshot:
+    """
+    Optimizer inputs in a directory of memory-mapped .npy files.
+
+    warehouses.npy and orders.npy are structured arrays with one record per
+    row: coordinates, stock, capacity, costs and quantities, plus integer
+    codes for every ID and text column. The labels behind the codes sit in
+    one small .npy per column; order IDs are stored row-aligned in
+    order_id.npy and only looked up when results are decoded. Opening a
+    snapshot maps the files read-only, so any number of processes share
+    one copy of the data in the page cache, and the numeric columns of
+    frames built from it are views rather than copies.
+    """
+
+    def __init__(self, path: str):
+        """
+        Open an existing snapshot.
+
+        Args:
+            path (str): Snapshot directory written by OptimizerSnapshot.write
+        """
+        self.logger = logging.getLogger(__name__)
+        self.path = path
+        try:
+            self._warehouses = self._map('warehouses')
+            self._orders = self._map('orders')
+            self._labels = {
+                column: self._map(column)
+                for column in WAREHOUSE_LABELS + ORDER_LABELS + ['order_id']
+            }
+        except Exception as e:
+            self.logger.error(f"Snapshot open error: {str(e)}")
+            raise ValueError(f"Snapshot open error: {str(e)}")
+
+    def _map(self, name: str) -> np.ndarray:
+        """Memory-map one array of the snapshot read-only"""
+        return np.load(os.path.join(self.path, f"{name}.npy"), mmap_mode='r', allow_pickle=False)
+
+    @classmethod
+    def write(cls, path: str, warehouses: pd.DataFrame, orders: pd.DataFrame) -> 'OptimizerSnapshot':
+        """
+        Export the optimizer columns of warehouses and orders to a snapshot.
+
+        Each exported column is converted in memory (text to label codes,
+        dates and numbers to their array dtype) and then copied into a
+        memory-mapped file, so the export temporarily holds one more copy of
+        those columns next to the frames. A complete snapshot replaces any
+        existing one at path.
+
+        Args:
+            path (str): Snapshot directory
+            warehouses (pd.DataFrame): Warehouses with stock, capacity and coordinates
+            orders (pd.DataFrame): Orders to allocate, e.g. DataLoader.get_pending_orders
+
+        Returns:
+            OptimizerSnapshot: The new snapshot, opened
+        """
+        logger = logging.getLogger(__name__)
+        staging = f"{path.rstrip(os.sep)}.{os.getpid()}.tmp"
+        try:
+            for frame, columns in ((warehouses, WAREHOUSE_LABELS + WAREHOUSE_FIELDS),
+                                   (orders, ['order_id'] + ORDER_LABELS + ORDER_FIELDS)):
+                missing = [column for column in columns if column not in frame.columns]
+                if missing:
+                    raise ValueError(f"Missing snapshot columns: {missing}")
+
+            os.makedirs(staging, exist_ok=True)
+            cls._write_table(staging, 'warehouses', warehouses, WAREHOUSE_LABELS, WAREHOUSE_FIELDS)
+            time_fields = [column for column in ORDER_TIME_FIELDS if column in orders.columns]
+            cls._write_table(staging, 'orders', orders, ORDER_LABELS, ORDER_FIELDS + time_fields)
+            np.save(os.path.join(staging, 'order_id.npy'), cls._label_array(orders['order_id']))
+
+            # Processes still mapping an old snapshot keep its (unlinked) files
+            if os.path.isdir(path):
+                shutil.rmtree(path)
+            os.replace(staging, path)
+            logger.info(f"Wrote optimizer snapshot of {len(warehouses)} warehouses and {len(orders)} orders")
+            return cls(path)
+
+        except Exception as e:
+            shutil.rmtree(staging, ignore_errors=True)
+            logger.error(f"Snapshot write error: {str(e)}")
+            raise ValueError(f"Snapshot write error: {str(e)}")
+
+    @classmethod
+    def _write_table(cls,
+                     directory: str,
+                     name: str,
+                     frame: pd.DataFrame,
+                     labels: List[str],
+                     fields: List[str]) -> None:
+        """Write one table as a structured array of label codes and numeric fields"""
+        columns = {}
+        for column in labels:
+            codes, uniques = pd.factorize(frame[column], sort=True)
+            np.save(os.path.join(directory, f"{column}.npy"), cls._label_array(uniques))
+            columns[column] = codes.astype(np.int32)
+        for column in fields:
+            values = frame[column]
+            if column in ORDER_TIME_FIELDS:
+                values = pd.to_datetime(values)
+            elif not pd.api.types.is_numeric_dtype(values):
+                values = pd.to_numeric(values, errors='coerce')
+            columns[column] = values.to_numpy()
+
+        table = np.lib.format.open_memmap(
+            os.path.join(directory, f"{name}.npy"), mode='w+',
+            dtype=[(column, values.dtype) for column, values in columns.items()],
+            shape=(len(frame),)
+        )
+        for column, values in columns.items():
+            table[column] = values
+        table.flush()
+        del table
+
+    @staticmethod
+    def _label_array(values) -> np.ndarray:
+        """Labels as a plain array; text becomes fixed-width unicode so it can be mapped"""
+        labels = np.asarray(values)
+        if labels.dtype.kind == 'O':
+            labels = labels.astype(str)
+        return labels
+
+    def __len__(self) -> int:
+        return len(self._orders)
+
+    def warehouses(self) -> pd.DataFrame:
+        """Warehouse frame; the numeric columns are views on the mapped file"""
+        # Code -1 marks a missing label
+        frame = {
+            column: pd.Categorical.from_codes(self._warehouses[column], categories=self._labels[column])
+            for column in WAREHOUSE_LABELS
+        }
+        frame.update({column: self._warehouses[column] for column in WAREHOUSE_FIELDS})
+        return pd.DataFrame(frame, copy=False)
+
+    def orders(self, rows: Optional[np.ndarray] = None) -> pd.DataFrame:
+        """
+        Order frame for all rows or a subset.
+
+        order_id holds the snapshot row of each order; decode_results turns
+        it back into the original IDs. Without rows the numeric columns are
+        views on the mapped file; with rows only the selected records are read.
+
+        Args:
+            rows (Optional[np.ndarray]): Snapshot rows to include, in this order
+        """
+        if rows is None:
+            records = self._orders
+            order_codes = np.arange(len(records))
+        else:
+            order_codes = np.asarray(rows, dtype=np.int64)
+            records = self._orders[order_codes]
+
+        frame = {'order_id': order_codes}
+        for column in ORDER_LABELS:
+            frame[column] = pd.Categorical.from_codes(records[column], categories=self._labels[column])
+        frame.update({column: records[column] for column in records.dtype.names if column not in frame})
+        return pd.DataFrame(frame, copy=False)
+
+    def order_ids(self, codes: np.ndarray) -> np.ndarray:
+        """Original order IDs of snapshot rows"""
+        return self._labels['order_id'][np.asarray(codes, dtype=np.int64)].astype(object)
+
+    def decode_results(self, results: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Copy of an optimization result over snapshot frames with the original order IDs.
+
+        Args:
+            results (Dict[str, Any]): Output of InventoryOptimizer.optimize on frames
+                from this snapshot
+        """
+        decoded = dict(results)
+        allocations = results['allocations'].assign(
+            order_id=self.order_ids(results['allocations']['order_id'].to_numpy())
+        )
+        decoded['allocations'] = allocations
+        decoded['allocation_plan'] = AllocationPlanView(allocations)
+
+        unfulfilled = results['unfulfilled_orders']
+        order_ids = self.order_ids([order['order_id'] for order in unfulfilled])
+        decoded['unfulfilled_orders'] = [
+            {**order, 'order_id': order_id} for order, order_id in zip(unfulfilled, order_ids)
+        ]
+        if 'split_orders' in results:
+            split_orders = results['split_orders']
+            decoded['split_orders'] = dict(zip(self.order_ids(list(split_orders)), split_orders.values()))
+        return decoded
@@ -0,0 +1,109 @@
+import logging
+from typing import Iterable, Optional, Tuple
+import pandas as pd
+import numpy as np
+from scipy import sparse
+
+
+class StockMatrix:
+    """
+    Warehouse x product stock held as a sparse CSC matrix.
+
+    Each column is one SKU and only lists the warehouses that carry it, so
+    looking up the stock of a product touches its carriers and nothing else.
+    """
+
+    def __init__(self, warehouse_ids: Iterable, product_ids: Iterable, matrix: sparse.spmatrix):
+        """
+        Args:
+            warehouse_ids (Iterable): Warehouse ID of each matrix row
+            product_ids (Iterable): Product ID of each matrix column
+            matrix (sparse.spmatrix): Stock quantities, shaped (warehouses, products)
+        """
+        self.logger = logging.getLogger(__name__)
+        self.warehouse_index = pd.Index(warehouse_ids)
+        self.product_index = pd.Index(product_ids)
+        matrix = sparse.csc_matrix(matrix)
+        matrix.eliminate_zeros()
+        matrix.sort_indices()
+        if matrix.shape != (len(self.warehouse_index), len(self.product_index)):
+            raise ValueError(
+                f"Stock matrix shape {matrix.shape} does not match "
+                f"{len(self.warehouse_index)} warehouses x {len(self.product_index)} products"
+            )
+        if (matrix.data < 0).any():
+            raise ValueError("Stock quantities cannot be negative")
+        self.matrix = matrix
+
+    @classmethod
+    def from_frame(cls,
+                   stock: pd.DataFrame,
+                   warehouse_ids: Optional[Iterable] = None,
+                   quantity_column: str = 'quantity') -> 'StockMatrix':
+        """
+        Build the matrix from long-format rows of warehouse_id, product_id and quantity.
+
+        Args:
+            stock (pd.DataFrame): One row per warehouse and product; duplicates are summed
+            warehouse_ids (Optional[Iterable]): Row order, e.g. warehouses['warehouse_id'];
+                defaults to the warehouses found in stock
+            quantity_column (str): Column holding the stock quantity
+        """
+        stock = stock[stock[quantity_column] > 0]
+        if warehouse_ids is None:
+            warehouse_index = pd.Index(pd.unique(stock['warehouse_id']))
+        else:
+            warehouse_index = pd.Index(warehouse_ids)
+        rows = warehouse_index.get_indexer(stock['warehouse_id'])
+        known = rows >= 0
+        if not known.all():
+            logging.getLogger(__name__).warning(
+                f"Ignoring stock of {(~known).sum()} rows for unknown warehouses"
+            )
+        product_codes, product_ids = pd.factorize(stock['product_id'][known])
+        matrix = sparse.csc_matrix(
+            (stock[quantity_column].to_numpy()[known], (rows[known], product_codes)),
+            shape=(len(warehouse_index), len(product_ids))
+        )
+        matrix.sum_duplicates()
+        return cls(warehouse_index, product_ids, matrix)
+
+    @property
+    def nnz(self) -> int:
+        """Number of stocked warehouse/product pairs"""
+        return self.matrix.nnz
+
+    def align(self, warehouse_ids: Iterable) -> 'StockMatrix':
+        """Reorder rows to the given warehouses; unknown warehouses get no stock"""
+        warehouse_index = pd.Index(warehouse_ids)
+        if warehouse_index.equals(self.warehouse_index):
+            return self
+        rows = self.warehouse_index.get_indexer(warehouse_index)
+        selector = sparse.csr_matrix(
+            (np.ones(int((rows >= 0).sum())), (np.flatnonzero(rows >= 0), rows[rows >= 0])),
+            shape=(len(warehouse_index), len(self.warehouse_index))
+        )
+        return StockMatrix(warehouse_index, self.product_index, selector @ self.matrix)
+
+    def product_stock(self, product_code: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Carriers of one product column.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (warehouse row positions, stock quantities)
+        """
+        start, end = self.matrix.indptr[product_code], self.matrix.indptr[product_code + 1]
+        return self.matrix.indices[start:end], self.matrix.data[start:end]
+
+    def totals(self) -> np.ndarray:
+        """Total stock per warehouse row"""
+        return np.asarray(self.matrix.sum(axis=1)).ravel()
+
+    def to_frame(self) -> pd.DataFrame:
+        """Long-format warehouse_id, product_id, quantity rows of the stocked pairs"""
+        coo = self.matrix.tocoo()
+        return pd.DataFrame({
+            'warehouse_id': self.warehouse_index[coo.row],
+            'product_id': self.product_index[coo.col],
+            'quantity': coo.data
+        })
@@ -0,0 +1,107 @@
+import logging
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+import pandas as pd
+import numpy as np
+
+
+class DataValidator:
+    """
+    Checks a table against a fixed set of rules in one vectorized pass.
+
+    Range and null rules are evaluated together: the range columns are
+    compared as one 2-D array against per-column bounds and the null columns
+    are tested in one call, so each chunk of rows is scanned once no matter
+    how many rules there are. Every failing row is reported, not just the
+    first rule that fails.
+    """
+
+    def __init__(self,
+                 required_columns: Iterable[str] = (),
+                 not_null: Iterable[str] = (),
+                 ranges: Optional[Dict[str, Tuple[float, float]]] = None):
+        """
+        Args:
+            required_columns (Iterable[str]): Columns the table must have
+            not_null (Iterable[str]): Columns that may not hold empty values
+            ranges (Optional[Dict[str, Tuple[float, float]]]): Column -> inclusive
+                (low, high) bounds; empty values are not range violations
+        """
+        self.logger = logging.getLogger(__name__)
+        self.required_columns = list(required_columns)
+        self.not_null = list(not_null)
+        self.ranges = dict(ranges or {})
+
+    def validate(self, df: pd.DataFrame) -> Dict[str, Any]:
+        """Validate a whole frame; see validate_chunks for the report"""
+        return self.validate_chunks([df])
+
+    def validate_chunks(self, chunks: Iterable[pd.DataFrame]) -> Dict[str, Any]:
+        """
+        Validate streamed input chunk by chunk.
+
+        Args:
+            chunks (Iterable[pd.DataFrame]): Consecutive pieces of one table, e.g. from
+                pd.read_csv(..., chunksize=...)
+
+        Returns:
+            Dict[str, Any]: 'valid', 'rows' checked, 'missing_columns' and
+                'violations', mapping each failed rule to the positions (0-based,
+                counted across chunks) of its offending rows
+        """
+        rows, missing_columns = 0, None
+        found: Dict[str, List[np.ndarray]] = {}
+        for chunk in chunks:
+            if missing_columns is None:
+                missing_columns = [col for col in self.required_columns if col not in chunk.columns]
+            for rule, positions in self._check(chunk):
+                found.setdefault(rule, []).append(positions + rows)
+            rows += len(chunk)
+
+        violations = {rule: np.concatenate(positions) for rule, positions in found.items()}
+        missing_columns = missing_columns or []
+        return {
+            'valid': not missing_columns and not violations,
+            'rows': rows,
+            'missing_columns': missing_columns,
+            'violations': violations
+        }
+
+    def _check(self, chunk: pd.DataFrame) -> List[Tuple[str, np.ndarray]]:
+        """Offending row positions of each rule failing in one chunk"""
+        rules, checks = [], []
+
+        range_columns = [col for col in self.ranges if col in chunk.columns]
+        if range_columns:
+            values = chunk[range_columns]
+            if not all(pd.api.types.is_numeric_dtype(values[col]) for col in range_columns):
+                values = values.apply(pd.to_numeric, errors='coerce')
+            values = values.to_numpy(dtype=float, na_value=np.nan)
+            bounds = np.array([self.ranges[col] for col in range_columns], dtype=float)
+            with np.errstate(invalid='ignore'):
+                checks.append((values < bounds[:, 0]) | (values > bounds[:, 1]))
+            rules.extend(
+                f"{col} outside [{low:g}, {high:g}]"
+                for col, (low, high) in zip(range_columns, bounds)
+            )
+
+        null_columns = [col for col in self.not_null if col in chunk.columns]
+        if null_columns:
+            checks.append(chunk[null_columns].isna().to_numpy())
+            rules.extend(f"{col} is empty" for col in null_columns)
+
+        if not checks:
+            return []
+        failed = np.hstack(checks)
+        return [(rules[rule], np.flatnonzero(failed[:, rule])) for rule in np.flatnonzero(failed.any(axis=0))]
+
+    @staticmethod
+    def describe(report: Dict[str, Any], limit: int = 5) -> str:
+        """One-line summary of a report, listing the first offending rows per rule"""
+        problems = []
+        if report['missing_columns']:
+            problems.append(f"missing columns {report['missing_columns']}")
+        for rule, positions in report['violations'].items():
+            shown = ', '.join(str(position) for position in positions[:limit])
+            more = ', ...' if len(positions) > limit else ''
+            problems.append(f"{rule} in {len(positions)} rows (rows {shown}{more})")
+        return '; '.join(problems) if problems else 'valid'
@@ -0,0 +1,266 @@
+import os
+import shutil
+import sqlite3
+from types import SimpleNamespace
+import numpy as np
+import pandas as pd
+import pytest
+from src.backend.data_loader import DataLoader, KM_PER_MILE, SAMPLE_FILES, SCHEMAS
+from src.backend.optimizer import InventoryOptimizer, STORAGE_COST_FACTOR
+
+
+@pytest.fixture
+def sample_dir(tmp_path, monkeypatch):
+    """Copy of the sample CSV files; the loader reads them relative to the working directory"""
+    (tmp_path / 'data').mkdir()
+    for path in SAMPLE_FILES.values():
+        if os.path.exists(path):
+            shutil.copy(path, tmp_path / path)
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def sqlite_database(path, chunk_with_null_region=False):
+    """SQLite copy of the sample warehouses and sales tables, sales with an extra column"""
+    sales = pd.read_csv(SAMPLE_FILES['sales_df']).assign(notes='not in the schema')
+    if chunk_with_null_region:
+        sales.loc[3:5, 'region'] = None  # the whole second chunk of three
+    with sqlite3.connect(path) as conn:
+        pd.read_csv(SAMPLE_FILES['warehouses_df']).to_sql('warehouses', conn, index=False)
+        sales.to_sql('sales', conn, index=False)
+    return SimpleNamespace(name=str(path))
+
+
+def test_refresh_merges_row_with_empty_category(sample_dir):
+    loader = DataLoader()
+    rows = len(loader.sales_df)
+    with open(sample_dir / SAMPLE_FILES['sales_df'], 'a') as f:
+        f.write("\nORD999,2025-03-24 21:00:00,P001,10,Late Customer,2025-03-26 21:00:00,,Pending,19.07,72.87")
+
+    assert loader.refresh() == {'sales_df': 1}
+    sales = loader.sales_df
+    assert len(sales) == rows + 1
+    assert isinstance(sales['region'].dtype, pd.CategoricalDtype)
+    assert pd.isna(sales.loc[sales['order_id'] == 'ORD999', 'region']).all()
+    assert sales['region'].notna().sum() == rows
+
+
+def test_database_chunk_with_all_null_category(tmp_path):
+    loader = DataLoader(sqlite_file=sqlite_database(tmp_path / 'logitrack.db', chunk_with_null_region=True))
+    loader.db_chunksize = 3
+
+    sales = loader.sales_df
+    expected = pd.read_csv(SAMPLE_FILES['sales_df'])
+    assert len(sales) == len(expected)
+    assert isinstance(sales['region'].dtype, pd.CategoricalDtype)
+    assert sales['region'].isna().sum() == 3
+
+
+def test_refresh_rereads_csv_edited_in_place(sample_dir):
+    loader = DataLoader()
+    warehouses = loader.warehouses_df
+    path = sample_dir / SAMPLE_FILES['warehouses_df']
+    original = path.read_text()
+
+    # Grows by one byte without appending a row
+    path.write_text(original.replace(',10000,7500,', ',10000,17500,'))
+    assert loader.refresh() == {'warehouses_df': 1}
+    stock = loader.warehouses_df.set_index('warehouse_id')['current_stock']
+    assert stock['W001'] == 17500
+    assert len(loader.warehouses_df) == len(warehouses)
+
+    # Same size, different contents
+    path.write_text(original.replace(',10000,7500,', ',10000,7600,'))
+    assert loader.refresh() == {'warehouses_df': 1}
+    assert loader.warehouses_df.set_index('warehouse_id')['current_stock']['W001'] == 7600
+
+    assert loader.refresh() == {}
+
+
+def test_database_refresh_skips_rows_tied_with_watermark(tmp_path):
+    loader = DataLoader(sqlite_file=sqlite_database(tmp_path / 'logitrack.db'))
+    warehouses = loader.warehouses_df
+    version = loader._versions['warehouses_df']
+
+    assert loader.refresh() == {}
+    assert loader._versions['warehouses_df'] == version
+    assert loader.warehouses_df is warehouses
+
+
+def test_database_table_is_projected_and_read_in_chunks(tmp_path):
+    loader = DataLoader(sqlite_file=sqlite_database(tmp_path / 'logitrack.db'))
+    loader.db_chunksize = 3
+
+    sales = loader.read_database_table(loader._database, 'sales', 'sales_df')
+    expected = pd.read_csv(SAMPLE_FILES['sales_df'])
+    assert list(sales.columns) == list(SCHEMAS['sales_df'])
+    assert 'notes' not in sales.columns
+    assert sales['quantity'].dtype == 'int32'
+    assert pd.api.types.is_datetime64_any_dtype(sales['date'])
+    assert sales['order_id'].tolist() == expected['order_id'].tolist()
+    assert sales['region'].astype(object).tolist() == expected['region'].tolist()
+
+
+def test_database_chunks_are_validated_while_streaming(tmp_path, monkeypatch):
+    database = sqlite_database(tmp_path / 'logitrack.db')
+    with sqlite3.connect(database.name) as conn:
+        conn.execute("UPDATE sales SET delivery_latitude = 95 WHERE order_id = 'ORD005'")
+    loader = DataLoader(sqlite_file=database)
+    loader.db_chunksize = 3
+    # The loaded frame is not scanned a second time
+    monkeypatch.setattr(loader.validators['sales_df'], 'validate', None)
+
+    with pytest.raises(ValueError, match='delivery_latitude outside'):
+        loader.load_table('sales_df')
+    report = loader.validation_reports['sales_df']
+    assert report['rows'] == 8
+    # Row positions are counted across chunks
+    assert report['violations']['delivery_latitude outside [-90, 90]'].tolist() == [4]
+
+
+def test_database_chunks_fill_preallocated_columns_that_grow(tmp_path):
+    loader = DataLoader(sqlite_file=sqlite_database(tmp_path / 'logitrack.db', chunk_with_null_region=True))
+    loader.db_chunksize = 3
+    sales = loader.read_database_table(loader._database, 'sales', 'sales_df')
+
+    # Columns sized for fewer rows than arrive, as when rows are inserted after the COUNT
+    chunks = [sales.iloc[start:start + 3].copy() for start in range(0, len(sales), 3)]
+    for chunk in chunks:
+        chunk['region'] = chunk['region'].cat.remove_unused_categories()
+    buffers = DataLoader._column_buffers(chunks[0], 1)
+    rows = 0
+    for chunk in chunks:
+        DataLoader._fill_column_buffers(buffers, chunk, rows)
+        rows += len(chunk)
+    pd.testing.assert_frame_equal(DataLoader._frame_from_buffers(buffers, rows), sales)
+
+
+def test_database_delta_query_filters_on_watermark(tmp_path):
+    database = sqlite_database(tmp_path / 'logitrack.db')
+    loader = DataLoader(sqlite_file=database)
+    loader.db_chunksize = 3
+    sales = loader.sales_df
+    watermark = loader._watermarks['sales_df']
+    assert watermark == sales['date'].max()
+
+    since = loader.read_database_table(loader._database, 'sales', 'sales_df', since=('date', watermark))
+    assert (since['date'] >= watermark).all()
+    assert len(since) == (sales['date'] >= watermark).sum()
+
+    new_row = pd.read_csv(SAMPLE_FILES['sales_df']).head(1).assign(
+        order_id='ORD999', date='2025-03-25 09:00:00', notes=''
+    )
+    with sqlite3.connect(database.name) as conn:
+        new_row.to_sql('sales', conn, index=False, if_exists='append')
+
+    assert loader.refresh() == {'sales_df': 1}
+    assert loader.sales_df['order_id'].iloc[0] == 'ORD999'
+    assert loader._watermarks['sales_df'] == pd.Timestamp('2025-03-25 09:00:00')
+
+
+def test_reorder_needs_use_per_sku_stock(sample_dir):
+    loader = DataLoader()
+    assert loader.stock_df is None
+    # Without per-SKU stock every product is measured against the network total
+    assert loader.calculate_reorder_needs().empty
+
+    pd.DataFrame({
+        'warehouse_id': ['W001', 'W002', 'W001', 'W003'],
+        'product_id': ['PROD001', 'PROD001', 'PROD002', 'PROD003'],
+        'quantity': [600, 500, 300, 900]
+    }).to_csv(sample_dir / SAMPLE_FILES['stock_df'], index=False)
+    loader = DataLoader()
+    assert loader.stock_df['quantity'].dtype == 'int32'
+
+    needs = loader.calculate_reorder_needs().set_index('product_id')
+    assert needs.index.tolist() == ['PROD002']
+    assert needs.loc['PROD002', 'current_stock'] == 300
+    assert 'stock_df' in loader.load_all()
+
+
+def test_database_without_stock_table_has_no_per_sku_stock(tmp_path):
+    database = sqlite_database(tmp_path / 'logitrack.db')
+    assert DataLoader(sqlite_file=database).stock_df is None
+
+    with sqlite3.connect(database.name) as conn:
+        pd.DataFrame({
+            'warehouse_id': ['W001'], 'product_id': ['PROD001'], 'quantity': [5]
+        }).to_sql('warehouse_stock', conn, index=False)
+    stock = DataLoader(sqlite_file=database).stock_df
+    assert stock.to_dict('records') == [{'warehouse_id': 'W001', 'product_id': 'PROD001', 'quantity': 5}]
+
+
+def test_per_sku_stock_limits_orders_to_product_carriers(sample_dir):
+    assert DataLoader().get_stock_matrix() is None
+
+    pd.DataFrame({
+        'warehouse_id': ['W004', 'W001'], 'product_id': ['P001', 'P002'], 'quantity': [5000, 5000]
+    }).to_csv(sample_dir / SAMPLE_FILES['stock_df'], index=False)
+    loader = DataLoader()
+    stock = loader.get_stock_matrix()
+    assert stock.warehouse_index.equals(pd.Index(loader.warehouses_df['warehouse_id']))
+
+    orders = loader.sales_df
+    results = InventoryOptimizer().optimize(loader.warehouses_df, orders, stock=stock)
+    products = orders.set_index('order_id')['product_id']
+    allocations = results['allocations']
+    carriers = products[allocations['order_id']].map({'P001': 'W004', 'P002': 'W001'})
+    assert allocations['warehouse_id'].tolist() == carriers.tolist()
+    assert len(allocations) == (products.isin(['P001', 'P002'])).sum()
+    unfulfilled = [order['order_id'] for order in results['unfulfilled_orders']]
+    assert set(products[unfulfilled]) == {'P003', 'P004'}
+
+
+def test_lane_index_is_built_when_transport_table_loads(sample_dir):
+    loader = DataLoader()
+    loader.load_table('transport_df')
+    assert loader._lane_index is not None
+
+    loader.transport_df = pd.DataFrame({
+        'origin_region': ['Mumbai'], 'destination_region': ['Asia'], 'cost_per_mile': [2.0]
+    })
+    assert len(loader._lane_index) == 1
+    assert loader.get_transport_costs('Mumbai', 'Asia') == 2.0
+
+
+def test_lane_rates_follow_orders_through_the_optimizer(sample_dir):
+    loader = DataLoader()
+    warehouses = loader.warehouses_df
+    orders = loader.sales_df.copy()
+    orders.loc[orders['order_id'] == 'ORD008', 'region'] = None
+    regions = orders['region'].dropna().unique().tolist()
+    # Every region has its own per-mile rate, except Dubai to the first region
+    loader.transport_df = pd.DataFrame([
+        {'origin_region': location, 'destination_region': region,
+         'cost_per_mile': KM_PER_MILE * (position + 1)}
+        for position, region in enumerate(regions)
+        for location in warehouses['location']
+        if (location, position) != ('Dubai', 0)
+    ])
+
+    rates = loader.get_lane_rates(warehouses, orders, default_rate=10)
+    assert rates.shape == (len(orders), len(warehouses))
+    expected = orders['region'].astype(object).map(
+        {region: position + 1 for position, region in enumerate(regions)}
+    ).fillna(10).to_numpy(dtype=float)
+    dubai = (warehouses['location'] == 'Dubai').to_numpy()
+    first_region = (orders['region'] == regions[0]).to_numpy()
+    np.testing.assert_allclose(rates[:, ~dubai], np.repeat(expected[:, None], (~dubai).sum(), axis=1))
+    np.testing.assert_allclose(rates[first_region][:, dubai], 10)
+
+    # Orders are re-sorted by priority inside optimize; each keeps its own rates
+    allocations = InventoryOptimizer().optimize(warehouses, orders, rates)['allocations']
+    positions = orders.reset_index(drop=True).reset_index().set_index('order_id')['index']
+    columns = warehouses.reset_index(drop=True).reset_index().set_index('warehouse_id')['index']
+    charged = rates[positions[allocations['order_id']], columns[allocations['warehouse_id']]]
+    storage = warehouses.set_index('warehouse_id')['storage_cost'][allocations['warehouse_id']]
+    np.testing.assert_allclose(
+        allocations['cost'],
+        allocations['distance'] * charged
+        + allocations['quantity'] * storage.to_numpy() * STORAGE_COST_FACTOR
+    )
+
+
+def test_lane_rates_without_matching_lanes(sample_dir):
+    loader = DataLoader()
+    assert loader.get_lane_rates(loader.warehouses_df, loader.sales_df, default_rate=10) is None
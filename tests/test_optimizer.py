@@ -0,0 +1,278 @@
+import time
+import numpy as np
+import pandas as pd
+import pytest
+from src.backend.optimizer import InventoryOptimizer
+from src.backend.stock_matrix import StockMatrix
+
+
+def small_network():
+    """Two warehouses, each stocking a different product, and one order next to A"""
+    warehouses = pd.DataFrame({
+        'warehouse_id': ['A', 'B'], 'name': ['A', 'B'], 'capacity': [100, 100],
+        'current_stock': [50, 50], 'storage_cost': [1, 1],
+        'latitude': [0.0, 5.0], 'longitude': [0.0, 5.0]
+    })
+    orders = pd.DataFrame({
+        'order_id': ['O1'], 'product_id': ['P1'], 'quantity': [5], 'status': ['Pending'],
+        'delivery_latitude': [0.1], 'delivery_longitude': [0.1]
+    })
+    stock = StockMatrix.from_frame(
+        pd.DataFrame({'warehouse_id': ['A', 'B'], 'product_id': ['P1', 'P2'], 'quantity': [50, 50]}),
+        warehouses['warehouse_id']
+    )
+    return warehouses, orders, stock
+
+
+def test_per_product_cache_key_includes_product_id():
+    warehouses, orders, stock = small_network()
+    optimizer = InventoryOptimizer()
+
+    first = optimizer.optimize(warehouses, orders, stock=stock)
+    second = optimizer.optimize(warehouses, orders.assign(product_id='P2'), stock=stock)
+
+    assert first['allocations']['warehouse_id'].tolist() == ['A']
+    assert second['allocations']['warehouse_id'].tolist() == ['B']
+    assert not second['performance_metrics'].get('cache_hit', False)
+
+
+def test_cached_result_is_not_changed_by_callers():
+    warehouses, orders, _ = small_network()
+    optimizer = InventoryOptimizer()
+
+    first = optimizer.optimize(warehouses, orders)
+    first['allocations'].loc[0, 'warehouse_id'] = 'B'
+    first['unfulfilled_orders'].append({'order_id': 'O1'})
+    first['performance_metrics']['total_orders'] = 99
+
+    second = optimizer.optimize(warehouses, orders)
+    assert second['performance_metrics']['cache_hit']
+    assert second['allocations']['warehouse_id'].tolist() == ['A']
+    assert second['unfulfilled_orders'] == []
+    assert second['performance_metrics']['total_orders'] == 1
+
+
+@pytest.mark.parametrize('mode', ['greedy', 'split'])
+def test_disk_cached_results_round_trip_without_pickle(tmp_path, mode):
+    warehouses, orders = competing_network()
+    # Integer warehouse IDs must come back as integers, not JSON object keys
+    warehouses['warehouse_id'] = [10, 20, 30]
+    first = InventoryOptimizer()
+    first.result_cache_dir = str(tmp_path)
+    fresh = first.optimize(warehouses, orders, mode=mode)
+    assert sorted(path.suffix for path in tmp_path.iterdir()) == ['.json', '.parquet']
+
+    second = InventoryOptimizer()
+    second.result_cache_dir = str(tmp_path)
+    cached = second.optimize(warehouses, orders, mode=mode)
+    assert cached['performance_metrics'].pop('cache_hit')
+    pd.testing.assert_frame_equal(cached['allocations'], fresh['allocations'])
+    assert cached['allocation_plan'] == fresh['allocation_plan']
+    for name in ('warehouse_utilization', 'split_orders', 'unfulfilled_orders',
+                 'performance_metrics', 'total_cost', 'status'):
+        assert cached.get(name) == fresh.get(name)
+
+
+def test_results_do_not_depend_on_earlier_runs_by_default():
+    warehouses, orders, _ = small_network()
+    optimizer = InventoryOptimizer()
+    optimizer.optimize(warehouses.assign(current_stock=[0, 50]), orders)
+
+    results = optimizer.optimize(warehouses, orders)
+    fresh = InventoryOptimizer().optimize(warehouses, orders)
+    assert results['allocations'].equals(fresh['allocations'])
+    assert 'warm_started_orders' not in results['performance_metrics']
+
+
+def test_stream_chunks_are_not_warm_started():
+    warehouses, orders, _ = small_network()
+    optimizer = InventoryOptimizer()
+    optimizer.warm_start = True
+    optimizer.optimize(warehouses.assign(current_stock=[0, 50]), orders)
+
+    for batch in optimizer.optimize_stream(warehouses, [orders]):
+        assert 'warm_started_orders' not in batch['performance_metrics']
+        assert batch['allocations']['warehouse_id'].tolist() == ['A']
+
+
+def competing_network():
+    """Two orders competing for warehouse A, one order served by B and a warehouse without coordinates"""
+    warehouses = pd.DataFrame({
+        'warehouse_id': ['A', 'B', 'C'], 'name': ['A', 'B', 'C'], 'capacity': [100, 100, 100],
+        'current_stock': [50, 50, 50], 'storage_cost': [1, 1, 1],
+        'latitude': [0.0, 5.0, np.nan], 'longitude': [0.0, 5.0, np.nan]
+    })
+    orders = pd.DataFrame({
+        'order_id': ['O1', 'O2', 'O3'], 'quantity': [40, 40, 5], 'status': ['Pending'] * 3,
+        'delivery_latitude': [0.1, 0.2, 5.1], 'delivery_longitude': [0.1, 0.2, 5.1]
+    })
+    return warehouses, orders
+
+
+@pytest.mark.filterwarnings('error::RuntimeWarning')
+def test_split_prices_lanes_without_warnings():
+    warehouses, orders = competing_network()
+    results = InventoryOptimizer().optimize(warehouses, orders, mode='split')
+
+    assert results['status'] == 'Completed'
+    assert results['performance_metrics']['solver_status'] == 'Optimal'
+    shipped = results['allocations'].groupby('warehouse_id')['quantity'].sum()
+    assert shipped.to_dict() == {'A': 50, 'B': 35}
+    assert results['split_orders']
+
+
+def test_split_past_deadline_keeps_a_feasible_plan():
+    warehouses, orders = competing_network()
+    results = InventoryOptimizer().optimize(warehouses, orders, mode='split', deadline=time.time())
+
+    assert results['status'] == 'Time Limit Reached'
+    assert results['performance_metrics']['solver_status'] == 'Not Solved'
+    # Competing orders are placed whole, O2 on the next warehouse with stock
+    assert results['allocations'].set_index('order_id')['warehouse_id'].to_dict() == {
+        'O1': 'A', 'O2': 'B', 'O3': 'B'
+    }
+    assert results['split_orders'] == {}
+
+
+@pytest.mark.parametrize('mode', ['greedy', 'milp', 'split'])
+def test_no_warehouses_leaves_every_order_unfulfilled(mode):
+    warehouses, orders = competing_network()
+    results = InventoryOptimizer().optimize(warehouses.iloc[:0], orders, mode=mode)
+
+    assert results['status'] == 'Completed'
+    assert results['allocations'].empty
+    assert sorted(order['order_id'] for order in results['unfulfilled_orders']) == ['O1', 'O2', 'O3']
+    assert results['performance_metrics']['fulfilled_orders'] == 0
+
+
+def random_network(n_warehouses, n_orders, stock_ratio, seed=0):
+    """Warehouses and orders spread over one region, total stock stock_ratio x demand"""
+    rng = np.random.default_rng(seed)
+    quantities = rng.integers(1, 50, n_orders)
+    stock = rng.dirichlet(np.ones(n_warehouses)) * quantities.sum() * stock_ratio
+    warehouses = pd.DataFrame({
+        'warehouse_id': [f'W{i}' for i in range(n_warehouses)],
+        'name': [f'W{i}' for i in range(n_warehouses)],
+        'capacity': np.ceil(stock).astype(int) + 100,
+        'current_stock': np.ceil(stock).astype(int),
+        'storage_cost': rng.uniform(1, 5, n_warehouses),
+        'latitude': rng.uniform(0, 10, n_warehouses), 'longitude': rng.uniform(0, 10, n_warehouses)
+    })
+    orders = pd.DataFrame({
+        'order_id': [f'O{i}' for i in range(n_orders)], 'quantity': quantities,
+        'status': rng.choice(['Pending', 'Urgent'], n_orders),
+        'delivery_latitude': rng.uniform(0, 10, n_orders),
+        'delivery_longitude': rng.uniform(0, 10, n_orders)
+    })
+    return warehouses, orders
+
+
+def shipped_within_stock(results, warehouses, reserved=0):
+    """Whether no warehouse ships more than its stock less reserved"""
+    shipped = results['allocations'].groupby('warehouse_id')['quantity'].sum()
+    available = (warehouses['current_stock'] - reserved).set_axis(warehouses['warehouse_id'])
+    return bool((shipped <= available[shipped.index]).all())
+
+
+def plain_greedy(warehouses, orders):
+    optimizer = InventoryOptimizer()
+    optimizer.local_search = False
+    return optimizer.optimize(warehouses, orders)
+
+
+def test_local_search_places_unserved_order_on_cheapest_lane():
+    assignments = np.array([-1])
+    order_costs = np.array([np.inf])
+    order_distances = np.array([np.inf])
+    stock = np.array([10, 10])
+    metrics = InventoryOptimizer._improve_assignments(
+        np.array([[0, 1]]), np.array([[9.0, 4.0]]), np.array([[3.0, 2.0]]), np.array([5]),
+        stock, assignments, order_costs, order_distances, time.time() + 5
+    )
+    # Placed there directly, not first on lane 0 and then relocated
+    assert (metrics['local_search_placements'], metrics['local_search_relocations']) == (1, 0)
+    assert assignments.tolist() == [1]
+    assert order_costs.tolist() == [4.0]
+    assert stock.tolist() == [10, 5]
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_local_search_never_costs_more_than_plain_greedy(seed):
+    warehouses, orders = random_network(12, 400, stock_ratio=1.1, seed=seed)
+    greedy = plain_greedy(warehouses, orders)
+    results = InventoryOptimizer().optimize(warehouses, orders)
+
+    assert shipped_within_stock(results, warehouses)
+    # Local search only adds orders, so compare over the orders greedy served
+    greedy_served = greedy['allocations']['order_id']
+    allocations = results['allocations']
+    assert greedy_served.isin(allocations['order_id']).all()
+    assert allocations.loc[allocations['order_id'].isin(greedy_served), 'cost'].sum() <= greedy['total_cost'] + 1e-6
+    assert results['performance_metrics']['local_search_savings'] > 0
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_split_never_costs_more_than_plain_greedy(seed):
+    warehouses, orders = random_network(12, 400, stock_ratio=1.5, seed=seed)
+    greedy = plain_greedy(warehouses, orders)
+    assert not greedy['unfulfilled_orders']
+    results = InventoryOptimizer().optimize(warehouses, orders, mode='split')
+
+    assert results['performance_metrics']['solver_status'] == 'Optimal'
+    assert shipped_within_stock(results, warehouses)
+    assert results['allocations']['quantity'].sum() == orders['quantity'].sum()
+    assert results['total_cost'] <= greedy['total_cost'] + 1e-6
+
+
+@pytest.mark.parametrize('seed', range(2))
+def test_milp_never_costs_more_than_plain_greedy(seed):
+    warehouses, orders = random_network(8, 150, stock_ratio=1.5, seed=seed)
+    greedy = plain_greedy(warehouses, orders)
+    assert not greedy['unfulfilled_orders']
+    optimizer = InventoryOptimizer()
+    optimizer.solver_time = 5
+    optimizer.min_utilization, optimizer.max_utilization = 0.0, 1.0
+    results = optimizer.optimize(warehouses, orders, mode='milp')
+
+    assert shipped_within_stock(results, warehouses)
+    assert not results['unfulfilled_orders']
+    assert results['total_cost'] <= greedy['total_cost'] + 1e-6
+
+
+def test_milp_respects_min_utilization():
+    warehouses, orders = random_network(8, 150, stock_ratio=1.2)
+    optimizer = InventoryOptimizer()
+    optimizer.solver_time = 5
+    results = optimizer.optimize(warehouses, orders, mode='milp')
+
+    assert shipped_within_stock(results, warehouses, optimizer.min_utilization * warehouses['capacity'])
+
+
+@pytest.mark.parametrize('mode', ['greedy', 'milp', 'split'])
+def test_runs_finish_within_solver_time(mode):
+    # Large enough that greedy local search and the split LP run out of time
+    warehouses, orders = random_network(60, 6000, stock_ratio=0.9)
+    optimizer = InventoryOptimizer()
+    optimizer.solver_time = 1
+    start = time.time()
+    results = optimizer.optimize(warehouses, orders, mode=mode)
+
+    assert time.time() - start <= optimizer.solver_time * 1.25
+    assert results['solving_time'] <= optimizer.solver_time * 1.25
+    assert shipped_within_stock(results, warehouses)
+
+
+def test_partitioned_run_reports_worst_sub_run_status():
+    warehouses, orders = competing_network()
+    orders = orders.assign(region='Equator')
+    optimizer = InventoryOptimizer()
+
+    results = optimizer.optimize_partitioned(warehouses, orders, mode='split', max_workers=1)
+    assert results['status'] == 'Completed'
+    assert results['performance_metrics']['solver_status'] == 'Optimal'
+
+    # No time for any LP solve: the regional run falls back to a greedy plan
+    optimizer.solver_time = 0
+    results = optimizer.optimize_partitioned(warehouses, orders, mode='split', max_workers=1)
+    assert results['status'] == 'Time Limit Reached'
+    assert results['performance_metrics']['solver_status'] == 'Not Solved'
@@ -0,0 +1,58 @@
+import pandas as pd
+import pytest
+from src.backend.optimizer import InventoryOptimizer
+from src.backend.session import OptimizationSession
+
+
+def network():
+    warehouses = pd.DataFrame({
+        'warehouse_id': ['A', 'B'], 'name': ['A', 'B'], 'capacity': [100, 100],
+        'current_stock': [10, 10], 'storage_cost': [1, 1],
+        'latitude': [0.0, 5.0], 'longitude': [0.0, 5.0]
+    })
+    orders = pd.DataFrame({
+        'order_id': ['O1', 'O2'], 'quantity': [8, 8], 'status': ['Pending', 'Pending'],
+        'delivery_latitude': [0.1, 5.1], 'delivery_longitude': [0.1, 5.1]
+    })
+    return warehouses, orders
+
+
+def test_add_orders_reports_modified_and_new_orders():
+    warehouses, orders = network()
+    session = OptimizationSession(warehouses, orders)
+
+    batch = pd.DataFrame({
+        'order_id': ['O1', 'O3', 'O4'], 'quantity': [20, 2, 2], 'status': ['Pending'] * 3,
+        'delivery_latitude': [0.1, 0.1, 5.1], 'delivery_longitude': [0.1, 0.1, 5.1]
+    })
+    changes = session.add_orders(batch)
+
+    # O1 no longer fits anywhere; its stock goes to the new O3
+    assert changes['unfulfilled'] == ['O1']
+    assert changes['allocated'] == {'O3': 'A', 'O4': 'B'}
+    assert session.last_update_time > 0
+
+
+def test_adjust_stock_rejects_unknown_warehouse_before_changing_stock():
+    warehouses, orders = network()
+    session = OptimizationSession(warehouses, orders)
+
+    with pytest.raises(ValueError, match="Unknown warehouse IDs: \\['Z'\\]"):
+        session.adjust_stock({'A': -10, 'Z': 5})
+    assert session.stock.tolist() == [10, 10]
+    assert session.results()['performance_metrics']['fulfilled_orders'] == 2
+
+
+def test_results_match_a_fresh_greedy_run():
+    warehouses, orders = network()
+    session = OptimizationSession(warehouses, orders)
+    session.adjust_stock({'B': -5})
+
+    results = session.results()
+    optimizer = InventoryOptimizer()
+    optimizer.local_search = False
+    fresh = optimizer.optimize(warehouses.assign(current_stock=[10, 5]), orders)
+    assert results['status'] == 'Completed'
+    pd.testing.assert_frame_equal(results['allocations'], fresh['allocations'])
+    assert results['unfulfilled_orders'] == fresh['unfulfilled_orders']
+    assert results['performance_metrics'] == fresh['performance_metrics']
@@ -0,0 +1,30 @@
+import numpy as np
+import pandas as pd
+from src.backend.data_loader import SAMPLE_FILES
+from src.backend.optimizer import InventoryOptimizer
+from src.backend.snapshot import OptimizerSnapshot
+
+
+def test_snapshot_run_matches_frame_run(tmp_path):
+    warehouses = pd.read_csv(SAMPLE_FILES['warehouses_df'])
+    orders = pd.read_csv(SAMPLE_FILES['sales_df'])
+    snapshot = OptimizerSnapshot.write(str(tmp_path / 'snapshot'), warehouses, orders)
+
+    for mode in ['greedy', 'split']:
+        expected = InventoryOptimizer().optimize(warehouses, orders, mode=mode)
+        results = InventoryOptimizer().optimize_snapshot(snapshot, mode=mode)
+        assert results['allocations'].astype(object).equals(expected['allocations'].astype(object))
+        assert results['unfulfilled_orders'] == expected['unfulfilled_orders']
+
+
+def test_missing_labels_read_back_as_missing(tmp_path):
+    warehouses = pd.read_csv(SAMPLE_FILES['warehouses_df'])
+    warehouses.loc[1, 'name'] = np.nan
+    orders = pd.read_csv(SAMPLE_FILES['sales_df'])
+    orders.loc[0, 'region'] = np.nan
+    snapshot = OptimizerSnapshot.write(str(tmp_path / 'snapshot'), warehouses, orders)
+
+    names = snapshot.warehouses()['name']
+    assert names.isna().tolist() == warehouses['name'].isna().tolist()
+    assert names.astype(object).dropna().tolist() == warehouses['name'].dropna().tolist()
+    assert snapshot.orders()['region'].isna().tolist() == orders['region'].isna().tolist()